@@ -0,0 +1,247 @@
+import os
+import sys
+import json
+import copy
+import time
+import shutil
+import tempfile
+import importlib
+import subprocess
+from generate_configuration import *
+
+# Timing / size comparisons for the generator.  Run from src/ like model_builder.py:
+#   python benchmark.py                  (all benchmarks)
+#   python benchmark.py scad_modules     (selected benchmarks)
+# run_config.json is restored when finished.
+
+base = shape_config
+
+configurations = [
+    {
+        'config_name': '6x6_Basic',
+        'nrows': 6,  # key rows
+        'ncols': 6,  # key columns
+        'oled_mount_type': None,
+        'controller_mount_type': 'RJ9_USB_WALL',
+    },
+    {
+        'config_name': '6x6_CtrlTray',
+        'nrows': 6,  # key rows
+        'ncols': 6,  # key columns
+        'oled_mount_type': None,
+        'controller_mount_type': 'EXTERNAL',
+    },
+    {
+        'config_name': '6x6_OLED_CtrlTray',
+        'nrows': 6,  # key rows
+        'ncols': 6,  # key columns
+        'oled_mount_type': 'CLIP',
+        'controller_mount_type': 'EXTERNAL',
+    },
+]
+
+dactyl_manuform = None
+
+
+def load_model(config, engine):
+    global dactyl_manuform
+    run_config = copy.deepcopy(base)
+    for item in config:
+        run_config[item] = config[item]
+    run_config['ENGINE'] = engine
+    run_config['save_dir'] = '.'
+    with open('run_config.json', mode='w') as fid:
+        json.dump(run_config, fid, indent=4)
+
+    if dactyl_manuform is None:
+        import dactyl_manuform
+    else:
+        importlib.reload(dactyl_manuform)
+    return dactyl_manuform
+
+
+def timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def openscad_render_time(fname):
+    if shutil.which('openscad') is None:
+        return None
+    start = time.perf_counter()
+    subprocess.run(['openscad', '-o', fname + '.stl', fname + '.scad'], capture_output=True)
+    return time.perf_counter() - start
+
+
+def scad_text_stats(fname):
+    with open(fname + '.scad', mode='r') as fid:
+        text = fid.read()
+    depth = 0
+    max_depth = 0
+    for c in text:
+        if c == '{':
+            depth += 1
+            max_depth = max(max_depth, depth)
+        elif c == '}':
+            depth -= 1
+    return len(text), max_depth, text.count('union()'), text.count('hull()')
+
+
+def report(config, name, value):
+    print('BENCH {:<20} {:<28} {}'.format(config['config_name'], name, value))
+
+
+def apply_settings(dm, settings):
+    # Settings are module globals; the ones the engine helpers also read are set there too.
+    for name, value in settings.items():
+        setattr(dm, name, value)
+        if hasattr(dm.helpers, name):
+            setattr(dm.helpers, name, value)
+
+
+def compare(config, engine, variants, measure):
+    # Loads the model once and reports what measure(dm, label) yields as (name, value) pairs, for
+    # each labelled set of settings in turn.
+    dm = load_model(config, engine)
+    for label, settings in variants.items():
+        apply_settings(dm, settings)
+        for name, value in measure(dm, label):
+            report(config, '{} {}'.format(label, name), value)
+
+
+def scad_measures(fname):
+    size, depth, unions, hulls = scad_text_stats(fname)
+    yield 'scad bytes', size
+    yield 'max nesting', depth
+    yield 'union nodes', unions
+    yield 'hull nodes', hulls
+    t_render = openscad_render_time(fname)
+    if t_render is not None:
+        yield 'openscad render s', '{:.2f}'.format(t_render)
+
+
+def bench_scad_modules(config, out_dir):
+    def measure(dm, label):
+        shape = dm.model_side(side="right")
+        fname = os.path.join(out_dir, '{}_{}'.format(config['config_name'], label))
+        _, t_export = timed(dm.export_file, shape=shape, fname=fname)
+        yield 'export s', '{:.2f}'.format(t_export)
+        yield from scad_measures(fname)
+
+    compare(config, 'solid', {'inline': {'scad_modules': False}, 'modules': {'scad_modules': True}}, measure)
+
+
+def bench_case_walls_scad(config, out_dir):
+    def measure(dm, label):
+        shape, t_build = timed(dm.case_walls)
+        fname = os.path.join(out_dir, '{}_case_walls'.format(config['config_name']))
+        dm.export_file(shape=shape, fname=fname)
+        yield 'build s', '{:.2f}'.format(t_build)
+        yield from scad_measures(fname)
+
+    compare(config, 'solid', {'case_walls': {}}, measure)
+
+
+def model_side_measure(dm, label):
+    shape, t_build = timed(dm.model_side, side="right")
+    yield 'model_side s', '{:.2f}'.format(t_build)
+    yield 'volume', '{:.1f}'.format(sum(item.Volume() for item in shape.vals()))
+
+
+def bench_parallel_build(config, out_dir):
+    compare(config, 'cadquery', {'sequential': {'parallel_build': False}, 'parallel': {'parallel_build': True}},
+            model_side_measure)
+
+
+def bench_hull_workers(config, out_dir):
+    def measure(dm, label):
+        for fn in [dm.connectors, dm.thumb_connectors]:
+            _, t_build = timed(fn)
+            yield fn.__name__ + ' s', '{:.2f}'.format(t_build)
+
+    workers = range(1, max(os.cpu_count(), 2) + 1)
+    compare(config, 'cadquery', {'{} workers'.format(n): {'hull_workers': n} for n in workers}, measure)
+
+
+def chain_parents(dm):
+    # The cadquery helpers as they were when they chained Workplane calls: each result is a child
+    # of the Workplane it was made from, so the whole build history stays reachable.
+    def chained(fn):
+        def wrapper(shape, *args, **kwargs):
+            result = fn(shape, *args, **kwargs)
+            if isinstance(shape, (list, tuple)):
+                shape = next((item for item in shape if item is not None), None)
+            if isinstance(shape, dm.helpers.cq.Workplane) and isinstance(result, dm.helpers.cq.Workplane):
+                return shape.newObject(result.vals())
+            return result
+        return wrapper
+
+    names = ['translate', 'rotate', 'mirror', 'union', 'add', 'difference', 'intersect']
+    return {name: chained(getattr(dm.helpers, name)) for name in names}
+
+
+def bench_peak_rss(config, out_dir):
+    # Peak RSS only ever grows, so each build runs in its own interpreter.
+    def measure(dm, label):
+        code = ("import resource, time, benchmark\n"
+                "dm = benchmark.load_model(benchmark.configurations[{}], 'cadquery')\n"
+                "if {}:\n"
+                "    benchmark.apply_settings(dm, benchmark.chain_parents(dm))\n"
+                "start = time.perf_counter()\n"
+                "dm.model_side(side='right')\n"
+                "print('PEAK', resource.getrusage(resource.RUSAGE_SELF).ru_maxrss, time.perf_counter() - start)\n"
+                ).format(configurations.index(config), dm.parent_chains)
+        output = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True).stdout
+        _, rss, t_build = output.strip().splitlines()[-1].split()
+        yield 'model_side s', '{:.2f}'.format(float(t_build))
+        yield 'model_side peak MB', '{:.0f}'.format(int(rss) / 1024)
+
+    compare(config, 'cadquery', {'parent chains': {'parent_chains': True}, 'bare': {'parent_chains': False}}, measure)
+
+
+boolean_settings = {
+    'default': {},
+    'serial': {'parallel': False},
+    'fuzzy 1e-4': {'fuzzy': 1e-4},
+}
+
+
+def bench_boolean_stages(config, out_dir):
+    def measure(dm, label):
+        dm.clear_boolean_stage_times()
+        yield from model_side_measure(dm, label)
+        for name, (count, seconds) in dm.helpers.boolean_stage_times.items():
+            yield '{} booleans s'.format(name), '{:.2f} ({})'.format(seconds, count)
+        for name, count in dm.helpers.boolean_fallbacks.items():
+            yield '{} booleans redone exactly'.format(name), count
+
+    defaults = base['boolean_stages']
+    variants = {label: {'boolean_stages': {name: dict(options, **settings) for name, options in defaults.items()}}
+                for label, settings in boolean_settings.items()}
+    compare(config, 'cadquery', variants, measure)
+
+
+benchmarks = {
+    'scad_modules': bench_scad_modules,
+    'case_walls_scad': bench_case_walls_scad,
+    'parallel_build': bench_parallel_build,
+    'hull_workers': bench_hull_workers,
+    'peak_rss': bench_peak_rss,
+    'boolean_stages': bench_boolean_stages,
+}
+
+
+if __name__ == '__main__':
+    selected = sys.argv[1:] if len(sys.argv) > 1 else list(benchmarks)
+    with open('run_config.json', mode='r') as fid:
+        original_config = fid.read()
+    out_dir = tempfile.mkdtemp(prefix='dactyl_bench_')
+    try:
+        for name in selected:
+            for config in configurations:
+                benchmarks[name](config, out_dir)
+    finally:
+        with open('run_config.json', mode='w') as fid:
+            fid.write(original_config)
+        shutil.rmtree(out_dir, ignore_errors=True)
@@ -5,6 +5,9 @@ import json
 import os
 
 from scipy.spatial import ConvexHull as sphull
+from helpers_dxf import circle_points, outline_loops, write_dxf
+from helpers_collisions import collision_report
+import helpers_skeleton
 
 def deg2rad(degrees: float) -> float:
     return degrees * pi / 180
@@ -52,8 +55,24 @@ else:
 ####################################################
 
 if ENGINE == 'cadquery':
+    import helpers_cadquery as helpers
+    helpers.hull_cache_enabled = hull_cache
+    helpers.experimental_strip_solids = experimental_strip_solids
+    helpers.bbox_culling = bbox_culling
+    helpers.floor_clamp = floor_clamp
+    helpers.export_formats = export_formats
+    helpers.export_tolerance = export_tolerance
+    helpers.export_angular_tolerance = export_angular_tolerance
     from helpers_cadquery import *
+elif ENGINE == 'skeleton':
+    import helpers_skeleton as helpers
+    from helpers_skeleton import *
 else:
+    import helpers_solid as helpers
+    helpers.scad_modules = scad_modules
+    helpers.polyhedron_hulls = polyhedron_hulls
+    helpers.floor_clamp = floor_clamp
+    helpers.export_formats = export_formats
     from helpers_solid import *
 
 ####################################################
@@ -69,6 +88,13 @@ def debugprint(info):
         print(info)
 
 
+def config_key():
+    # The configuration as it stands, to key caches of things built from it: benchmark.py and
+    # sweep.py change the module globals in place between builds.
+    values = [globals()[name] for name in cfg.shape_config if name in globals()]
+    return repr([item.tolist() if isinstance(item, np.ndarray) else item for item in values])
+
+
 if oled_mount_type is not None:
     for item in oled_configurations[oled_mount_type]:
         locals()[item] = oled_configurations[oled_mount_type][item]
@@ -110,11 +136,19 @@ if oled_mount_type is not None:
 
 
 cap_top_height = plate_thickness + sa_profile_key_height
-row_radius = ((mount_height + extra_height) / 2) / (np.sin(alpha / 2)) + cap_top_height
-column_radius = (
-                        ((mount_width + extra_width) / 2) / (np.sin(beta / 2))
-                ) + cap_top_height
-column_x_delta = -1 - column_radius * np.sin(beta)
+
+
+def curvature_radii(alpha, beta):
+    # Radii of the arcs the rows and columns sit on, and the column x step for orthographic columns.
+    row_radius = ((mount_height + extra_height) / 2) / (np.sin(alpha / 2)) + cap_top_height
+    column_radius = (
+                            ((mount_width + extra_width) / 2) / (np.sin(beta / 2))
+                    ) + cap_top_height
+    column_x_delta = -1 - column_radius * np.sin(beta)
+    return row_radius, column_radius, column_x_delta
+
+
+row_radius, column_radius, column_x_delta = curvature_radii(alpha, beta)
 column_base_angle = beta * (centercol - 2)
 
 
@@ -260,30 +294,21 @@ def single_plate(cylinder_segments=100, side="right"):
 
 
 
+# Per cap size in u, half width and half length of the SA cap at its base (bw2, bl2) and top (pw2, pl2),
+# and the half size of the square it passes through 6 mm up (m, 0 for none).  The cap length is
+# 18.25 here whatever sa_length says.
+sa_cap_dimensions = {
+    1: {'bw2': 18.5 / 2, 'bl2': 18.5 / 2, 'm': 17 / 2, 'pw2': 6, 'pl2': 6},
+    2: {'bw2': 18.25 / 2, 'bl2': 18.25, 'm': 0, 'pw2': 6, 'pl2': 16},
+    1.5: {'bw2': 27.94 / 2, 'bl2': 18.25 / 2, 'm': 0, 'pw2': 11, 'pl2': 6},
+}
+
+
 def sa_cap(Usize=1):
     # MODIFIED TO NOT HAVE THE ROTATION.  NEEDS ROTATION DURING ASSEMBLY
-    sa_length = 18.25
-
-    if Usize == 1:
-        bl2 = 18.5/2
-        bw2 = 18.5/2
-        m = 17 / 2
-        pl2 = 6
-        pw2 = 6
-
-    elif Usize == 2:
-        bl2 = sa_length
-        bw2 = sa_length / 2
-        m = 0
-        pl2 = 16
-        pw2 = 6
-
-    elif Usize == 1.5:
-        bl2 = sa_length / 2
-        bw2 = 27.94 / 2
-        m = 0
-        pl2 = 6
-        pw2 = 11
+    size = sa_cap_dimensions[Usize]
+    bw2, bl2, m = size['bw2'], size['bl2'], size['m']
+    pw2, pl2 = size['pw2'], size['pl2']
 
     k1 = polyline([(bw2, bl2), (bw2, -bl2), (-bw2, -bl2), (-bw2, bl2), (bw2, bl2)])
     k1 = extrude_poly(outer_poly=k1, height=0.1)
@@ -306,6 +331,23 @@ def sa_cap(Usize=1):
     return key_cap
 
 
+def sa_cap_boxes(Usize=1, slices=4):
+    # Boxes stacked up the height of sa_cap(), each as wide as the cap at its bottom, so together they
+    # follow the taper: (center, half extents) before placement.
+    size = sa_cap_dimensions[Usize]
+    sections = [(0.05, size['bw2'], size['bl2'])]
+    if size['m'] > 0:
+        sections.append((6.0, size['m'], size['m']))
+    sections.append((12.1, size['pw2'], size['pl2']))
+    z, bw2, bl2 = np.array(sections).T
+    levels = np.linspace(z[0], z[-1], slices + 1)
+    boxes = []
+    for bottom, top in zip(levels[:-1], levels[1:]):
+        boxes.append(([0, 0, 5 + plate_thickness + (bottom + top) / 2],
+                      [np.interp(bottom, z, bw2), np.interp(bottom, z, bl2), (top - bottom) / 2]))
+    return boxes
+
+
 #########################
 ## Placement Functions ##
 #########################
@@ -401,6 +443,19 @@ def key_place(shape, column, row):
     return apply_key_geometry(shape, translate, x_rot, y_rot, column, row)
 
 
+def x_rot_matrix(matrix, angle):
+    return helpers_skeleton.rotate(matrix, [rad2deg(angle), 0, 0])
+
+
+def y_rot_matrix(matrix, angle):
+    return helpers_skeleton.rotate(matrix, [0, rad2deg(angle), 0])
+
+
+def key_matrix(matrix, column, row):
+    # key_place() on a placement matrix, whatever the engine.
+    return apply_key_geometry(matrix, helpers_skeleton.translate, x_rot_matrix, y_rot_matrix, column, row)
+
+
 def add_translate(shape, xyz):
     debugprint('add_translate()')
     vals = []
@@ -418,29 +473,103 @@ def key_position(position, column, row):
 
 def key_holes(side="right"):
     debugprint('key_holes()')
-    # hole = single_plate()
-    holes = []
-    for column in range(ncols):
-        for row in range(nrows):
-            if (column in [2, 3]) or (not row == lastrow):
-                holes.append(key_place(single_plate(side=side), column, row))
+    layout = key_layout()
+    hole = single_plate(side=side)
+    holes = [transform(hole, matrix) for matrix in layout['transform'][layout['column'] >= 0]]
 
     shape = union(holes)
 
     return shape
 
 
-def caps():
-    caps = None
+def key_grid():
+    # (column, row) of every key in the main grid.
+    keys = []
     for column in range(ncols):
         for row in range(nrows):
             if (column in [2, 3]) or (not row == lastrow):
-                if caps is None:
-                    caps = key_place(sa_cap(), column, row)
-                else:
-                    caps = add([caps, key_place(sa_cap(), column, row)])
+                keys.append((column, row))
+    return keys
+
+
+def key_placements():
+    # One function per key of the main grid, placing a plate or cap matrix at that key.  Placements
+    # work on helpers_skeleton matrices whatever the engine; transform() puts shapes there.
+    return [lambda matrix, column=column, row=row: key_matrix(matrix, column, row) for column, row in key_grid()]
+
+
+def placement_matrices(placements):
+    return np.array([place(np.eye(4)) for place in placements])
+
+
+layout_dtype = np.dtype([
+    ('id', 'U8'),
+    ('column', int),  # grid column and row, -1 for thumb keys
+    ('row', int),
+    ('size', float),  # cap size in u
+    ('transform', float, (4, 4)),  # plate placement
+    ('cap_transform', float, (4, 4)),  # cap placement
+])
+
 
-    return caps
+key_layout_cache = {}
+
+
+def key_layout():
+    # Every key of the right side, main grid (in key_grid() order) then thumbs, with its placements
+    # worked out once per configuration.  Stages place their parts with transform() from here.
+    key = config_key()
+    if key not in key_layout_cache:
+        key_layout_cache.clear()
+        key_layout_cache[key] = build_key_layout()
+    return key_layout_cache[key]
+
+
+def build_key_layout():
+    grid = key_grid()
+    thumb_caps = thumb_cap_placements()
+    layout = np.zeros(len(grid) + len(thumb_caps), dtype=layout_dtype)
+    layout['id'] = ['c{}r{}'.format(column, row) for column, row in grid] + \
+                   ['thumb{}'.format(i) for i in range(len(thumb_caps))]
+    layout['column'] = [column for column, _ in grid] + [-1] * len(thumb_caps)
+    layout['row'] = [row for _, row in grid] + [-1] * len(thumb_caps)
+    layout['size'] = [1] * len(grid) + [size for size, _ in thumb_caps]
+    layout['transform'] = placement_matrices(key_placements() + thumb_plate_placements())
+    layout['cap_transform'][:len(grid)] = layout['transform'][:len(grid)]
+    layout['cap_transform'][len(grid):] = placement_matrices([place for _, place in thumb_caps])
+    return layout
+
+
+neighbour_steps = {'right': (1, 0), 'down': (0, 1), 'diagonal': (1, 1)}
+
+
+def key_neighbours(layout):
+    # Index into layout of the grid key one column right, one row down and diagonally down right
+    # of each key, one column per neighbour_steps entry, -1 where there is none.
+    index = {(column, row): i for i, (column, row) in enumerate(zip(layout['column'], layout['row'])) if column >= 0}
+    neighbours = np.full((len(layout), len(neighbour_steps)), -1)
+    for (column, row), i in index.items():
+        for j, (step_column, step_row) in enumerate(neighbour_steps.values()):
+            neighbours[i, j] = index.get((column + step_column, row + step_row), -1)
+    return neighbours
+
+
+def key_run(column, row, step):
+    # (column, row) of the grid keys from (column, row) on, following the neighbour_steps neighbour
+    # of each while there is one.
+    layout = key_layout()
+    neighbours = key_neighbours(layout)[:, list(neighbour_steps).index(step)]
+    key = np.nonzero((layout['column'] == column) & (layout['row'] == row))[0][0]
+    run = []
+    while key >= 0:
+        run.append((int(layout['column'][key]), int(layout['row'][key])))
+        key = neighbours[key]
+    return run
+
+
+def caps():
+    layout = key_layout()
+    return place_instances(sa_cap(), layout['cap_transform'][layout['column'] >= 0])
 
 
 ####################
@@ -490,40 +619,44 @@ def web_post_br(wide=False):
 
 
 
+def connector_strips():
+    # Post sequences between neighbouring keys, each one hulled as a triangle strip.  The last row
+    # is joined to the rest by the thumb connectors.
+    layout = key_layout()
+    neighbours = key_neighbours(layout)
+    neighbours[layout['row'] >= lastrow] = -1
+    neighbours[(neighbours >= 0) & (layout['row'][neighbours] >= lastrow)] = -1
+    right, down, diagonal = neighbours.T
+
+    def place(post, key):
+        return transform(post, layout['transform'][key])
+
+    strips = []
+    for key in np.nonzero(right >= 0)[0]:
+        strips.append([place(web_post_tl(), right[key]), place(web_post_tr(), key),
+                       place(web_post_bl(), right[key]), place(web_post_br(), key)])
+
+    for key in np.nonzero(down >= 0)[0]:
+        strips.append([place(web_post_bl(), key), place(web_post_br(), key),
+                       place(web_post_tl(), down[key]), place(web_post_tr(), down[key])])
+
+    for key in np.nonzero(diagonal >= 0)[0]:
+        strips.append([place(web_post_br(), key), place(web_post_tr(), down[key]),
+                       place(web_post_bl(), right[key]), place(web_post_tl(), diagonal[key])])
+
+    return strips
+
+
+def triangle_hull_strips(strips):
+    # Worker processes only for cadquery; parallel_build stage workers run with hull_workers = 1.
+    if ENGINE == 'cadquery' and hull_workers > 1:
+        return parallel_triangle_hulls(strips, hull_workers)
+    return union([triangle_hulls(places) for places in strips])
+
+
 def connectors():
     debugprint('connectors()')
-    hulls = []
-    for column in range(ncols - 1):
-        for row in range(lastrow):  # need to consider last_row?
-            # for row in range(nrows):  # need to consider last_row?
-            places = []
-            places.append(key_place(web_post_tl(), column + 1, row))
-            places.append(key_place(web_post_tr(), column, row))
-            places.append(key_place(web_post_bl(), column + 1, row))
-            places.append(key_place(web_post_br(), column, row))
-            hulls.append(triangle_hulls(places))
-
-    for column in range(ncols):
-        # for row in range(nrows-1):
-        for row in range(cornerrow):
-            places = []
-            places.append(key_place(web_post_bl(), column, row))
-            places.append(key_place(web_post_br(), column, row))
-            places.append(key_place(web_post_tl(), column, row + 1))
-            places.append(key_place(web_post_tr(), column, row + 1))
-            hulls.append(triangle_hulls(places))
-
-    for column in range(ncols - 1):
-        # for row in range(nrows-1):  # need to consider last_row?
-        for row in range(cornerrow):  # need to consider last_row?
-            places = []
-            places.append(key_place(web_post_br(), column, row))
-            places.append(key_place(web_post_tr(), column, row + 1))
-            places.append(key_place(web_post_bl(), column + 1, row))
-            places.append(key_place(web_post_tl(), column + 1, row + 1))
-            hulls.append(triangle_hulls(places))
-
-    return union(hulls)
+    return triangle_hull_strips(connector_strips())
 
 
 ############
@@ -533,105 +666,98 @@ def connectors():
 
 def thumborigin():
     # debugprint('thumborigin()')
-    origin = key_position([mount_width / 2, -(mount_height / 2), 0], 1, cornerrow)
+    if ENGINE == 'skeleton':
+        # Same point through the placement matrix, which may be a batch of them (sweep.py).
+        origin = (key_matrix(np.eye(4), 1, cornerrow) @ [mount_width / 2, -(mount_height / 2), 0, 1])[..., :3].T
+    else:
+        origin = key_position([mount_width / 2, -(mount_height / 2), 0], 1, cornerrow)
     for i in range(len(origin)):
         origin[i] = origin[i] + thumb_offsets[i]
     return origin
 
 
-def thumb_tr_place(shape):
-    debugprint('thumb_tr_place()')
-    shape = rotate(shape, [10, -23, 10])
-    shape = translate(shape, thumborigin())
-    shape = translate(shape, [-12, -16, 3])
-    return shape
-
-
-def thumb_tl_place(shape):
-    debugprint('thumb_tl_place()')
-    shape = rotate(shape, [10, -23, 10])
+# Each thumb key as a rotation and an offset from thumborigin(), per thumb_style.
+thumb_positions = {
+    'DEFAULT': {
+        'tr': ([10, -23, 10], [-12, -16, 3]),
+        'tl': ([10, -23, 10], [-32, -15, -2]),
+        'mr': ([-6, -34, 48], [-29, -40, -13]),
+        'ml': ([6, -34, 40], [-51, -25, -12]),
+        'br': ([-16, -33, 54], [-37.8, -55.3, -25.3]),
+        'bl': ([-4, -35, 52], [-56.3, -43.3, -23.5]),
+    },
+    'MINI': {
+        'tr': ([14, -15, 10], [-15, -10, 5]),
+        'tl': ([10, -23, 25], [-35, -16, -2]),
+        'mr': ([10, -23, 25], [-23, -34, -6]),
+        'br': ([6, -34, 35], [-39, -43, -16]),
+        'bl': ([6, -32, 35], [-51, -25, -11.5]),
+    },
+    'CARBONFET': {
+        'tl': ([10, -24, 10], [-13, -9.8, 4]),
+        'tr': ([6, -25, 10], [-7.5, -29.5, 0]),
+        'ml': ([8, -31, 14], [-30.5, -17, -6]),
+        'mr': ([4, -31, 14], [-22.2, -41, -10.3]),
+        'br': ([2, -37, 18], [-37, -46.4, -22]),
+        'bl': ([6, -37, 18], [-47, -23, -19]),
+    },
+}
+
+
+def thumb_position(position):
+    # A position the style does not have (wire_posts() uses ml, which MINI lacks) is the DEFAULT one.
+    return thumb_positions.get(thumb_style, {}).get(position, thumb_positions['DEFAULT'][position])
+
+
+def thumb_place(shape, position):
+    debugprint('thumb_place()')
+    rotation, offset = thumb_position(position)
+    shape = rotate(shape, rotation)
     shape = translate(shape, thumborigin())
-    shape = translate(shape, [-32, -15, -2])
+    shape = translate(shape, offset)
     return shape
 
 
-def thumb_mr_place(shape):
-    debugprint('thumb_mr_place()')
-    shape = rotate(shape, [-6, -34, 48])
-    shape = translate(shape, thumborigin())
-    shape = translate(shape, [-29, -40, -13])
-    return shape
+def thumb_matrix(matrix, position):
+    # thumb_place() on a placement matrix, whatever the engine.
+    rotation, offset = thumb_position(position)
+    matrix = helpers_skeleton.rotate(matrix, rotation)
+    matrix = helpers_skeleton.translate(matrix, thumborigin())
+    matrix = helpers_skeleton.translate(matrix, offset)
+    return matrix
 
 
-def thumb_ml_place(shape):
-    debugprint('thumb_ml_place()')
-    shape = rotate(shape, [6, -34, 40])
-    shape = translate(shape, thumborigin())
-    shape = translate(shape, [-51, -25, -12])
-    return shape
+def thumb_placement(position):
+    # thumb_place() at one position, for code taking a place function such as wall_brace().
+    return lambda shape: thumb_place(shape, position)
 
 
-def thumb_br_place(shape):
-    debugprint('thumb_br_place()')
-    shape = rotate(shape, [-16, -33, 54])
-    shape = translate(shape, thumborigin())
-    shape = translate(shape, [-37.8, -55.3, -25.3])
-    return shape
+def thumb_1x_placements(cap=False):
+    # One function per 1u thumb key, placing a plate at that key.  The mr cap
+    # is not turned with its plate.
+    return [
+        (lambda matrix: thumb_matrix(matrix, 'mr')) if cap else
+        (lambda matrix: thumb_matrix(helpers_skeleton.rotate(matrix, [0, 0, thumb_plate_mr_rotation]), 'mr')),
+        lambda matrix: thumb_matrix(helpers_skeleton.rotate(matrix, [0, 0, thumb_plate_ml_rotation]), 'ml'),
+        lambda matrix: thumb_matrix(helpers_skeleton.rotate(matrix, [0, 0, thumb_plate_br_rotation]), 'br'),
+        lambda matrix: thumb_matrix(helpers_skeleton.rotate(matrix, [0, 0, thumb_plate_bl_rotation]), 'bl'),
+    ]
 
 
-def thumb_bl_place(shape):
-    debugprint('thumb_bl_place()')
-    shape = rotate(shape, [-4, -35, 52])
-    shape = translate(shape, thumborigin())
-    shape = translate(shape, [-56.3, -43.3, -23.5])
-    return shape
+def thumb_15x_placements():
+    return [
+        lambda matrix: thumb_matrix(helpers_skeleton.rotate(matrix, [0, 0, thumb_plate_tr_rotation]), 'tr'),
+        lambda matrix: thumb_matrix(helpers_skeleton.rotate(matrix, [0, 0, thumb_plate_tl_rotation]), 'tl'),
+    ]
 
 
-def thumb_1x_layout(shape, cap=False):
-    debugprint('thumb_1x_layout()')
-    if cap:
-        shapes = thumb_mr_place(shape)
-        shapes = shapes.add(thumb_ml_place(rotate(shape, [0, 0, thumb_plate_ml_rotation])))
-        shapes = shapes.add(thumb_br_place(rotate(shape, [0, 0, thumb_plate_br_rotation])))
-        shapes = shapes.add(thumb_bl_place(rotate(shape, [0, 0, thumb_plate_bl_rotation])))
-    else:
-        shapes = union(
-            [
-                thumb_mr_place(rotate(shape, [0, 0, thumb_plate_mr_rotation])),
-                thumb_ml_place(rotate(shape, [0, 0, thumb_plate_ml_rotation])),
-                thumb_br_place(rotate(shape, [0, 0, thumb_plate_br_rotation])),
-                thumb_bl_place(rotate(shape, [0, 0, thumb_plate_bl_rotation])),
-            ]
-        )
-    return shapes
-
-
-def thumb_15x_layout(shape, cap=False, plate=True):
+def thumb_15x_layout(shape):
+    # shape at the 1.5u keys without the plate rotations, for the double plates.
     debugprint('thumb_15x_layout()')
-    if plate:
-        if cap:
-            shape = rotate(shape, (0, 0, 90))
-            return add([
-                thumb_tr_place(rotate(shape, [0, 0, thumb_plate_tr_rotation])),
-                thumb_tl_place(rotate(shape, [0, 0, thumb_plate_tl_rotation])).solids().objects[0]
-            ])
-        else:
-            return union([
-                thumb_tr_place(rotate(shape, [0, 0, thumb_plate_tr_rotation])),
-                thumb_tl_place(rotate(shape, [0, 0, thumb_plate_tl_rotation])),
-            ])
-    else:
-        if cap:
-            shape = rotate(shape, (0, 0, 90))
-            return add([
-                thumb_tr_place(shape),
-                thumb_tl_place(shape).solids().objects[0]
-            ])
-        else:
-            return union([
-                thumb_tr_place(shape),
-                thumb_tl_place(shape),
-            ])
+    return union([
+        thumb_place(shape, 'tr'),
+        thumb_place(shape, 'tl'),
+    ])
 
 
 def double_plate_half():
@@ -649,21 +775,47 @@ def double_plate():
 
 
 def thumbcaps():
+    # One sa_cap() per size, placed at its thumb slots.
+    layout = key_layout()
+    thumbs = layout[layout['column'] < 0]
+    sizes = list(dict.fromkeys(thumbs['size']))
+    return add([place_instances(sa_cap(size), thumbs['cap_transform'][thumbs['size'] == size]) for size in sizes])
+
+
+def thumb_plates(side="right"):
+    # single_plate() at every thumb key.
+    layout = key_layout()
+    plate = single_plate(side=side)
+    return union([transform(plate, matrix) for matrix in layout['transform'][layout['column'] < 0]])
+
+
+def thumb(side="right", plates=True):
+    if thumb_style == "MINI":
+        return mini_thumb(side, plates)
+    elif thumb_style == "CARBONFET":
+        return carbonfet_thumb(side, plates)
+    else:
+        return default_thumb(side, plates)
+
+
+def thumb_plate_placements():
+    # Where thumb() puts each single_plate(), one function per plate.
     if thumb_style == "MINI":
-        return mini_thumbcaps()
+        return mini_thumb_plate_placements()
     elif thumb_style == "CARBONFET":
-        return carbonfet_thumbcaps()
+        return carbonfet_thumb_plate_placements()
     else:
-        return default_thumbcaps()
+        return default_thumb_plate_placements()
 
 
-def thumb(side="right"):
+def thumb_cap_placements():
+    # (cap size, placement) for each thumb key cap.
     if thumb_style == "MINI":
-        return mini_thumb(side)
+        return mini_thumb_cap_placements()
     elif thumb_style == "CARBONFET":
-        return carbonfet_thumb(side)
+        return carbonfet_thumb_cap_placements()
     else:
-        return default_thumb(side)
+        return default_thumb_cap_placements()
 
 
 def thumb_connectors():
@@ -675,20 +827,26 @@ def thumb_connectors():
         return default_thumb_connectors()
 
 
-def default_thumbcaps():
-    t1 = thumb_1x_layout(sa_cap(1), cap=True)
-    t15 = thumb_15x_layout(sa_cap(1.5), cap=True)
-    return t1.add(t15)
-
-
-def default_thumb(side="right"):
+def default_thumb(side="right", plates=True):
     print('thumb()')
-    shape = thumb_1x_layout(rotate(single_plate(side=side), (0, 0, -90)))
-    shape = union([shape, thumb_15x_layout(rotate(single_plate(side=side), (0, 0, -90)))])
-    shape = union([shape, thumb_15x_layout(double_plate(), plate=False)])
+    shape = None
+    if plates:
+        shape = thumb_plates(side)
+    shape = union([shape, thumb_15x_layout(double_plate())])
     return shape
 
 
+def default_thumb_plate_placements():
+    return [lambda matrix, place=place: place(helpers_skeleton.rotate(matrix, (0, 0, -90)))
+            for place in thumb_1x_placements() + thumb_15x_placements()]
+
+
+def default_thumb_cap_placements():
+    caps = [(1, place) for place in thumb_1x_placements(cap=True)]
+    return caps + [(1.5, lambda matrix, place=place: place(helpers_skeleton.rotate(matrix, (0, 0, 90))))
+                   for place in thumb_15x_placements()]
+
+
 def thumb_post_tr():
     debugprint('thumb_post_tr()')
     return translate(web_post(),
@@ -717,211 +875,165 @@ def thumb_post_br():
                      )
 
 
-def default_thumb_connectors():
-    print('thumb_connectors()')
-    hulls = []
+def default_thumb_connector_strips():
+    strips = []
 
     # Top two
-    hulls.append(
-        triangle_hulls(
-            [
-                thumb_tl_place(thumb_post_tr()),
-                thumb_tl_place(thumb_post_br()),
-                thumb_tr_place(thumb_post_tl()),
-                thumb_tr_place(thumb_post_bl()),
-            ]
-        )
+    strips.append(
+        [
+            thumb_place(thumb_post_tr(), 'tl'),
+            thumb_place(thumb_post_br(), 'tl'),
+            thumb_place(thumb_post_tl(), 'tr'),
+            thumb_place(thumb_post_bl(), 'tr'),
+        ]
     )
 
     # bottom two on the right
-    hulls.append(
-        triangle_hulls(
-            [
-                thumb_br_place(web_post_tr()),
-                thumb_br_place(web_post_br()),
-                thumb_mr_place(web_post_tl()),
-                thumb_mr_place(web_post_bl()),
-            ]
-        )
+    strips.append(
+        [
+            thumb_place(web_post_tr(), 'br'),
+            thumb_place(web_post_br(), 'br'),
+            thumb_place(web_post_tl(), 'mr'),
+            thumb_place(web_post_bl(), 'mr'),
+        ]
     )
 
     # bottom two on the left
-    hulls.append(
-        triangle_hulls(
-            [
-                thumb_br_place(web_post_tr()),
-                thumb_br_place(web_post_br()),
-                thumb_mr_place(web_post_tl()),
-                thumb_mr_place(web_post_bl()),
-            ]
-        )
+    strips.append(
+        [
+            thumb_place(web_post_tr(), 'br'),
+            thumb_place(web_post_br(), 'br'),
+            thumb_place(web_post_tl(), 'mr'),
+            thumb_place(web_post_bl(), 'mr'),
+        ]
     )
     # centers of the bottom four
-    hulls.append(
-        triangle_hulls(
-            [
-                thumb_bl_place(web_post_tr()),
-                thumb_bl_place(web_post_br()),
-                thumb_ml_place(web_post_tl()),
-                thumb_ml_place(web_post_bl()),
-            ]
-        )
+    strips.append(
+        [
+            thumb_place(web_post_tr(), 'bl'),
+            thumb_place(web_post_br(), 'bl'),
+            thumb_place(web_post_tl(), 'ml'),
+            thumb_place(web_post_bl(), 'ml'),
+        ]
     )
 
     # top two to the middle two, starting on the left
-    hulls.append(
-        triangle_hulls(
-            [
-                thumb_br_place(web_post_tl()),
-                thumb_bl_place(web_post_bl()),
-                thumb_br_place(web_post_tr()),
-                thumb_bl_place(web_post_br()),
-                thumb_mr_place(web_post_tl()),
-                thumb_ml_place(web_post_bl()),
-                thumb_mr_place(web_post_tr()),
-                thumb_ml_place(web_post_br()),
-            ]
-        )
+    strips.append(
+        [
+            thumb_place(web_post_tl(), 'br'),
+            thumb_place(web_post_bl(), 'bl'),
+            thumb_place(web_post_tr(), 'br'),
+            thumb_place(web_post_br(), 'bl'),
+            thumb_place(web_post_tl(), 'mr'),
+            thumb_place(web_post_bl(), 'ml'),
+            thumb_place(web_post_tr(), 'mr'),
+            thumb_place(web_post_br(), 'ml'),
+        ]
     )
 
     # top two to the main keyboard, starting on the left
-    hulls.append(
-        triangle_hulls(
-            [
-                thumb_tl_place(thumb_post_tl()),
-                thumb_ml_place(web_post_tr()),
-                thumb_tl_place(thumb_post_bl()),
-                thumb_ml_place(web_post_br()),
-                thumb_tl_place(thumb_post_br()),
-                thumb_mr_place(web_post_tr()),
-                thumb_tr_place(thumb_post_bl()),
-                thumb_mr_place(web_post_br()),
-                thumb_tr_place(thumb_post_br()),
-            ]
-        )
+    strips.append(
+        [
+            thumb_place(thumb_post_tl(), 'tl'),
+            thumb_place(web_post_tr(), 'ml'),
+            thumb_place(thumb_post_bl(), 'tl'),
+            thumb_place(web_post_br(), 'ml'),
+            thumb_place(thumb_post_br(), 'tl'),
+            thumb_place(web_post_tr(), 'mr'),
+            thumb_place(thumb_post_bl(), 'tr'),
+            thumb_place(web_post_br(), 'mr'),
+            thumb_place(thumb_post_br(), 'tr'),
+        ]
     )
 
-    hulls.append(
-        triangle_hulls(
-            [
-                thumb_tl_place(thumb_post_tl()),
-                key_place(web_post_bl(), 0, cornerrow),
-                thumb_tl_place(thumb_post_tr()),
-                key_place(web_post_br(), 0, cornerrow),
-                thumb_tr_place(thumb_post_tl()),
-                key_place(web_post_bl(), 1, cornerrow),
-                thumb_tr_place(thumb_post_tr()),
-                key_place(web_post_br(), 1, cornerrow),
-                key_place(web_post_tl(), 2, lastrow),
-                key_place(web_post_bl(), 2, lastrow),
-                thumb_tr_place(thumb_post_tr()),
-                key_place(web_post_bl(), 2, lastrow),
-                thumb_tr_place(thumb_post_br()),
-                key_place(web_post_br(), 2, lastrow),
-                key_place(web_post_bl(), 3, lastrow),
-                key_place(web_post_tr(), 2, lastrow),
-                key_place(web_post_tl(), 3, lastrow),
-                key_place(web_post_bl(), 3, cornerrow),
-                key_place(web_post_tr(), 3, lastrow),
-                key_place(web_post_br(), 3, cornerrow),
-                key_place(web_post_bl(), 4, cornerrow),
-            ]
-        )
+    strips.append(
+        [
+            thumb_place(thumb_post_tl(), 'tl'),
+            key_place(web_post_bl(), 0, cornerrow),
+            thumb_place(thumb_post_tr(), 'tl'),
+            key_place(web_post_br(), 0, cornerrow),
+            thumb_place(thumb_post_tl(), 'tr'),
+            key_place(web_post_bl(), 1, cornerrow),
+            thumb_place(thumb_post_tr(), 'tr'),
+            key_place(web_post_br(), 1, cornerrow),
+            key_place(web_post_tl(), 2, lastrow),
+            key_place(web_post_bl(), 2, lastrow),
+            thumb_place(thumb_post_tr(), 'tr'),
+            key_place(web_post_bl(), 2, lastrow),
+            thumb_place(thumb_post_br(), 'tr'),
+            key_place(web_post_br(), 2, lastrow),
+            key_place(web_post_bl(), 3, lastrow),
+            key_place(web_post_tr(), 2, lastrow),
+            key_place(web_post_tl(), 3, lastrow),
+            key_place(web_post_bl(), 3, cornerrow),
+            key_place(web_post_tr(), 3, lastrow),
+            key_place(web_post_br(), 3, cornerrow),
+            key_place(web_post_bl(), 4, cornerrow),
+        ]
     )
 
-    hulls.append(
-        triangle_hulls(
-            [
-                key_place(web_post_br(), 1, cornerrow),
-                key_place(web_post_tl(), 2, lastrow),
-                key_place(web_post_bl(), 2, cornerrow),
-                key_place(web_post_tr(), 2, lastrow),
-                key_place(web_post_br(), 2, cornerrow),
-                key_place(web_post_bl(), 3, cornerrow),
-            ]
-        )
+    strips.append(
+        [
+            key_place(web_post_br(), 1, cornerrow),
+            key_place(web_post_tl(), 2, lastrow),
+            key_place(web_post_bl(), 2, cornerrow),
+            key_place(web_post_tr(), 2, lastrow),
+            key_place(web_post_br(), 2, cornerrow),
+            key_place(web_post_bl(), 3, cornerrow),
+        ]
     )
 
-    hulls.append(
-        triangle_hulls(
-            [
-                key_place(web_post_tr(), 3, lastrow),
-                key_place(web_post_br(), 3, lastrow),
-                key_place(web_post_tr(), 3, lastrow),
-                key_place(web_post_bl(), 4, cornerrow),
-            ]
-        )
+    strips.append(
+        [
+            key_place(web_post_tr(), 3, lastrow),
+            key_place(web_post_br(), 3, lastrow),
+            key_place(web_post_tr(), 3, lastrow),
+            key_place(web_post_bl(), 4, cornerrow),
+        ]
     )
 
-    return union(hulls)
+    return strips
+
+
+def default_thumb_connectors():
+    print('thumb_connectors()')
+    return triangle_hull_strips(default_thumb_connector_strips())
 
 ############################
 # MINI THUMB CLUSTER
 ############################
 
 
-def mini_thumb_tr_place(shape):
-    shape = rotate(shape, [14, -15, 10])
-    shape = translate(shape, thumborigin())
-    shape = translate(shape, [-15, -10, 5])
-    return shape
+def mini_thumb_1x_placements():
+    return [
+        lambda matrix: thumb_matrix(helpers_skeleton.rotate(matrix, [0, 0, thumb_plate_mr_rotation]), 'mr'),
+        lambda matrix: thumb_matrix(helpers_skeleton.rotate(matrix, [0, 0, thumb_plate_br_rotation]), 'br'),
+        lambda matrix: thumb_matrix(helpers_skeleton.rotate(matrix, [0, 0, thumb_plate_tl_rotation]), 'tl'),
+        lambda matrix: thumb_matrix(helpers_skeleton.rotate(matrix, [0, 0, thumb_plate_bl_rotation]), 'bl'),
+    ]
 
 
-def mini_thumb_tl_place(shape):
-    shape = rotate(shape, [10, -23, 25])
-    shape = translate(shape, thumborigin())
-    shape = translate(shape, [-35, -16, -2])
-    return shape
+def mini_thumb_15x_placements():
+    return [lambda matrix: thumb_matrix(helpers_skeleton.rotate(matrix, [0, 0, thumb_plate_tr_rotation]), 'tr')]
 
 
-def mini_thumb_mr_place(shape):
-    shape = rotate(shape, [10, -23, 25])
-    shape = translate(shape, thumborigin())
-    shape = translate(shape, [-23, -34, -6])
-    return shape
+def mini_thumb(side="right", plates=True):
+    if not plates:
+        return None
 
+    shape = thumb_plates(side)
 
-def mini_thumb_br_place(shape):
-    shape = rotate(shape, [6, -34, 35])
-    shape = translate(shape, thumborigin())
-    shape = translate(shape, [-39, -43, -16])
     return shape
 
 
-def mini_thumb_bl_place(shape):
-    shape = rotate(shape, [6, -32, 35])
-    shape = translate(shape, thumborigin())
-    shape = translate(shape, [-51, -25, -11.5])
-    return shape
-
-
-def mini_thumb_1x_layout(shape):
-    return union([
-        mini_thumb_mr_place(rotate(shape, [0, 0, thumb_plate_mr_rotation])),
-        mini_thumb_br_place(rotate(shape, [0, 0, thumb_plate_br_rotation])),
-        mini_thumb_tl_place(rotate(shape, [0, 0, thumb_plate_tl_rotation])),
-        mini_thumb_bl_place(rotate(shape, [0, 0, thumb_plate_bl_rotation])),
-    ])
-
-
-def mini_thumb_15x_layout(shape):
-    return union([mini_thumb_tr_place(rotate(shape, [0, 0, thumb_plate_tr_rotation]))])
-
+def mini_thumb_plate_placements():
+    return mini_thumb_1x_placements() + mini_thumb_15x_placements()
 
-def mini_thumbcaps():
-    t1 = mini_thumb_1x_layout(sa_cap(1))
-    t15 = mini_thumb_15x_layout(rotate(sa_cap(1), pi / 2, [0, 0, 1]))
-    return t1.add(t15)
 
-
-def mini_thumb(side="right"):
-
-    # shape = thumb_1x_layout(sl.rotate([0.0, 0.0, -90])(single_plate(side=side)))
-    # shape += thumb_15x_layout(sl.rotate([0.0, 0.0, -90])(single_plate(side=side)))
-    shape = mini_thumb_1x_layout(single_plate(side=side))
-    shape = union([shape, mini_thumb_15x_layout(single_plate(side=side))])
-
-    return shape
+def mini_thumb_cap_placements():
+    # The 1.5u slot takes a 1u cap, turned a quarter.
+    return [(1, place) for place in mini_thumb_1x_placements()] + \
+           [(1, lambda matrix, place=place: place(helpers_skeleton.rotate(matrix, (0, 0, 90)))) for place in mini_thumb_15x_placements()]
 
 
 def mini_thumb_post_tr():
@@ -948,137 +1060,123 @@ def mini_thumb_post_br():
     )
 
 
-def mini_thumb_connectors():
-    hulls = []
+def mini_thumb_connector_strips():
+    strips = []
 
     # Top two
-    hulls.append(
-        triangle_hulls(
-            [
-                mini_thumb_tl_place(web_post_tr()),
-                mini_thumb_tl_place(web_post_br()),
-                mini_thumb_tr_place(mini_thumb_post_tl()),
-                mini_thumb_tr_place(mini_thumb_post_bl()),
-            ]
-        )
+    strips.append(
+        [
+            thumb_place(web_post_tr(), 'tl'),
+            thumb_place(web_post_br(), 'tl'),
+            thumb_place(mini_thumb_post_tl(), 'tr'),
+            thumb_place(mini_thumb_post_bl(), 'tr'),
+        ]
     )
 
     # bottom two on the right
-    hulls.append(
-        triangle_hulls(
-            [
-                mini_thumb_br_place(web_post_tr()),
-                mini_thumb_br_place(web_post_br()),
-                mini_thumb_mr_place(web_post_tl()),
-                mini_thumb_mr_place(web_post_bl()),
-            ]
-        )
+    strips.append(
+        [
+            thumb_place(web_post_tr(), 'br'),
+            thumb_place(web_post_br(), 'br'),
+            thumb_place(web_post_tl(), 'mr'),
+            thumb_place(web_post_bl(), 'mr'),
+        ]
     )
 
     # bottom two on the left
-    hulls.append(
-        triangle_hulls(
-            [
-                mini_thumb_mr_place(web_post_tr()),
-                mini_thumb_mr_place(web_post_br()),
-                mini_thumb_tr_place(mini_thumb_post_br()),
-            ]
-        )
+    strips.append(
+        [
+            thumb_place(web_post_tr(), 'mr'),
+            thumb_place(web_post_br(), 'mr'),
+            thumb_place(mini_thumb_post_br(), 'tr'),
+        ]
     )
 
     # between top and bottom row
-    hulls.append(
-        triangle_hulls(
-            [
-                mini_thumb_br_place(web_post_tl()),
-                mini_thumb_bl_place(web_post_bl()),
-                mini_thumb_br_place(web_post_tr()),
-                mini_thumb_bl_place(web_post_br()),
-                mini_thumb_mr_place(web_post_tl()),
-                mini_thumb_tl_place(web_post_bl()),
-                mini_thumb_mr_place(web_post_tr()),
-                mini_thumb_tl_place(web_post_br()),
-                mini_thumb_tr_place(web_post_bl()),
-                mini_thumb_mr_place(web_post_tr()),
-                mini_thumb_tr_place(web_post_br()),
-            ]
-        )
+    strips.append(
+        [
+            thumb_place(web_post_tl(), 'br'),
+            thumb_place(web_post_bl(), 'bl'),
+            thumb_place(web_post_tr(), 'br'),
+            thumb_place(web_post_br(), 'bl'),
+            thumb_place(web_post_tl(), 'mr'),
+            thumb_place(web_post_bl(), 'tl'),
+            thumb_place(web_post_tr(), 'mr'),
+            thumb_place(web_post_br(), 'tl'),
+            thumb_place(web_post_bl(), 'tr'),
+            thumb_place(web_post_tr(), 'mr'),
+            thumb_place(web_post_br(), 'tr'),
+        ]
     )
     # top two to the main keyboard, starting on the left
-    hulls.append(
-        triangle_hulls(
-            [
-                mini_thumb_tl_place(web_post_tl()),
-                mini_thumb_bl_place(web_post_tr()),
-                mini_thumb_tl_place(web_post_bl()),
-                mini_thumb_bl_place(web_post_br()),
-                mini_thumb_mr_place(web_post_tr()),
-                mini_thumb_tl_place(web_post_bl()),
-                mini_thumb_tl_place(web_post_br()),
-                mini_thumb_mr_place(web_post_tr()),
-            ]
-        )
+    strips.append(
+        [
+            thumb_place(web_post_tl(), 'tl'),
+            thumb_place(web_post_tr(), 'bl'),
+            thumb_place(web_post_bl(), 'tl'),
+            thumb_place(web_post_br(), 'bl'),
+            thumb_place(web_post_tr(), 'mr'),
+            thumb_place(web_post_bl(), 'tl'),
+            thumb_place(web_post_br(), 'tl'),
+            thumb_place(web_post_tr(), 'mr'),
+        ]
     )
     # top two to the main keyboard, starting on the left
-    hulls.append(
-        triangle_hulls(
-            [
-                mini_thumb_tl_place(web_post_tl()),
-                key_place(web_post_bl(), 0, cornerrow),
-                mini_thumb_tl_place(web_post_tr()),
-                key_place(web_post_br(), 0, cornerrow),
-                mini_thumb_tr_place(mini_thumb_post_tl()),
-                key_place(web_post_bl(), 1, cornerrow),
-                mini_thumb_tr_place(mini_thumb_post_tr()),
-                key_place(web_post_br(), 1, cornerrow),
-                key_place(web_post_tl(), 2, lastrow),
-                key_place(web_post_bl(), 2, lastrow),
-                mini_thumb_tr_place(mini_thumb_post_tr()),
-                key_place(web_post_bl(), 2, lastrow),
-                mini_thumb_tr_place(mini_thumb_post_br()),
-                key_place(web_post_br(), 2, lastrow),
-                key_place(web_post_bl(), 3, lastrow),
-                key_place(web_post_tr(), 2, lastrow),
-                key_place(web_post_tl(), 3, lastrow),
-                key_place(web_post_bl(), 3, cornerrow),
-                key_place(web_post_tr(), 3, lastrow),
-                key_place(web_post_br(), 3, cornerrow),
-            ]
-        )
+    strips.append(
+        [
+            thumb_place(web_post_tl(), 'tl'),
+            key_place(web_post_bl(), 0, cornerrow),
+            thumb_place(web_post_tr(), 'tl'),
+            key_place(web_post_br(), 0, cornerrow),
+            thumb_place(mini_thumb_post_tl(), 'tr'),
+            key_place(web_post_bl(), 1, cornerrow),
+            thumb_place(mini_thumb_post_tr(), 'tr'),
+            key_place(web_post_br(), 1, cornerrow),
+            key_place(web_post_tl(), 2, lastrow),
+            key_place(web_post_bl(), 2, lastrow),
+            thumb_place(mini_thumb_post_tr(), 'tr'),
+            key_place(web_post_bl(), 2, lastrow),
+            thumb_place(mini_thumb_post_br(), 'tr'),
+            key_place(web_post_br(), 2, lastrow),
+            key_place(web_post_bl(), 3, lastrow),
+            key_place(web_post_tr(), 2, lastrow),
+            key_place(web_post_tl(), 3, lastrow),
+            key_place(web_post_bl(), 3, cornerrow),
+            key_place(web_post_tr(), 3, lastrow),
+            key_place(web_post_br(), 3, cornerrow),
+        ]
     )
-    hulls.append(
-        triangle_hulls(
-            [
-                key_place(web_post_tr(), 3, lastrow),
-                key_place(web_post_br(), 3, lastrow),
-                key_place(web_post_bl(), 4, cornerrow),
-            ]
-        )
+    strips.append(
+        [
+            key_place(web_post_tr(), 3, lastrow),
+            key_place(web_post_br(), 3, lastrow),
+            key_place(web_post_bl(), 4, cornerrow),
+        ]
     )
 
-    hulls.append(
-        triangle_hulls(
-            [
-                key_place(web_post_tr(), 3, lastrow),
-                key_place(web_post_br(), 3, cornerrow),
-                key_place(web_post_bl(), 4, cornerrow),
-            ]
-        )
+    strips.append(
+        [
+            key_place(web_post_tr(), 3, lastrow),
+            key_place(web_post_br(), 3, cornerrow),
+            key_place(web_post_bl(), 4, cornerrow),
+        ]
     )
-    hulls.append(
-        triangle_hulls(
-            [
-                key_place(web_post_br(), 1, cornerrow),
-                key_place(web_post_tl(), 2, lastrow),
-                key_place(web_post_bl(), 2, cornerrow),
-                key_place(web_post_tr(), 2, lastrow),
-                key_place(web_post_br(), 2, cornerrow),
-                key_place(web_post_bl(), 3, cornerrow),
-            ]
-        )
+    strips.append(
+        [
+            key_place(web_post_br(), 1, cornerrow),
+            key_place(web_post_tl(), 2, lastrow),
+            key_place(web_post_bl(), 2, cornerrow),
+            key_place(web_post_tr(), 2, lastrow),
+            key_place(web_post_br(), 2, cornerrow),
+            key_place(web_post_bl(), 3, cornerrow),
+        ]
     )
 
-    return union(hulls)
+    return strips
+
+
+def mini_thumb_connectors():
+    return triangle_hull_strips(mini_thumb_connector_strips())
 
 
 ############################
@@ -1086,77 +1184,46 @@ def mini_thumb_connectors():
 ############################
 
 
-def carbonfet_thumb_tl_place(shape):
-    shape = rotate(shape, [10, -24, 10])
-    shape = translate(shape, thumborigin())
-    shape = translate(shape, [-13, -9.8, 4])
-    return shape
-
-def carbonfet_thumb_tr_place(shape):
-    shape = rotate(shape, [6, -25, 10])
-    shape = translate(shape, thumborigin())
-    shape = translate(shape, [-7.5, -29.5, 0])
-    return shape
+def carbonfet_thumb_1x_placements():
+    return [
+        lambda matrix: thumb_matrix(helpers_skeleton.rotate(matrix, [0, 0, thumb_plate_tr_rotation]), 'tr'),
+        lambda matrix: thumb_matrix(helpers_skeleton.rotate(matrix, [0, 0, thumb_plate_mr_rotation]), 'mr'),
+        lambda matrix: thumb_matrix(helpers_skeleton.rotate(matrix, [0, 0, thumb_plate_br_rotation]), 'br'),
+        lambda matrix: thumb_matrix(helpers_skeleton.rotate(matrix, [0, 0, thumb_plate_tl_rotation]), 'tl'),
+    ]
 
-def carbonfet_thumb_ml_place(shape):
-    shape = rotate(shape, [8, -31, 14])
-    shape = translate(shape, thumborigin())
-    shape = translate(shape, [-30.5, -17, -6])
-    return shape
 
-def carbonfet_thumb_mr_place(shape):
-    shape = rotate(shape, [4, -31, 14])
-    shape = translate(shape, thumborigin())
-    shape = translate(shape, [-22.2, -41, -10.3])
-    return shape
+def carbonfet_thumb_15x_placements():
+    return [
+        lambda matrix: thumb_matrix(helpers_skeleton.rotate(matrix, [0, 0, thumb_plate_bl_rotation]), 'bl'),
+        lambda matrix: thumb_matrix(helpers_skeleton.rotate(matrix, [0, 0, thumb_plate_ml_rotation]), 'ml'),
+    ]
 
-def carbonfet_thumb_br_place(shape):
-    shape = rotate(shape, [2, -37, 18])
-    shape = translate(shape, thumborigin())
-    shape = translate(shape, [-37, -46.4, -22])
-    return shape
 
-def carbonfet_thumb_bl_place(shape):
-    shape = rotate(shape, [6, -37, 18])
-    shape = translate(shape, thumborigin())
-    shape = translate(shape, [-47, -23, -19])
-    return shape
-
-
-def carbonfet_thumb_1x_layout(shape):
+def carbonfet_thumb_15x_layout(shape):
+    # shape at the 1.5u keys without the plate rotations, for the double plates.
     return union([
-        carbonfet_thumb_tr_place(rotate(shape, [0, 0, thumb_plate_tr_rotation])),
-        carbonfet_thumb_mr_place(rotate(shape, [0, 0, thumb_plate_mr_rotation])),
-        carbonfet_thumb_br_place(rotate(shape, [0, 0, thumb_plate_br_rotation])),
-        carbonfet_thumb_tl_place(rotate(shape, [0, 0, thumb_plate_tl_rotation])),
+        thumb_place(shape, 'bl'),
+        thumb_place(shape, 'ml')
     ])
 
 
-def carbonfet_thumb_15x_layout(shape, plate=True):
-    if plate:
-        return union([
-            carbonfet_thumb_bl_place(rotate(shape, [0, 0, thumb_plate_bl_rotation])),
-            carbonfet_thumb_ml_place(rotate(shape, [0, 0, thumb_plate_ml_rotation]))
-        ])
-    else:
-        return union([
-            carbonfet_thumb_bl_place(shape),
-            carbonfet_thumb_ml_place(shape)
-        ])
+def carbonfet_thumb(side="right", plates=True):
+    shape = None
+    if plates:
+        shape = thumb_plates(side)
+    shape = union([shape, carbonfet_thumb_15x_layout(double_plate_half())])
 
+    return shape
 
-def carbonfet_thumbcaps():
-    t1 = carbonfet_thumb_1x_layout(sa_cap(1))
-    t15 = carbonfet_thumb_15x_layout(rotate(sa_cap(1.5), pi / 2, [0, 0, 1]))
-    return t1.add(t15)
 
+def carbonfet_thumb_plate_placements():
+    return carbonfet_thumb_1x_placements() + carbonfet_thumb_15x_placements()
 
-def carbonfet_thumb(side="right"):
-    shape = carbonfet_thumb_1x_layout(single_plate(side=side))
-    shape = union([shape, carbonfet_thumb_15x_layout(double_plate_half(), plate=False)])
-    shape = union([shape, carbonfet_thumb_15x_layout(single_plate(side=side))])
 
-    return shape
+def carbonfet_thumb_cap_placements():
+    return [(1, place) for place in carbonfet_thumb_1x_placements()] + \
+           [(1.5, lambda matrix, place=place: place(helpers_skeleton.rotate(matrix, (0, 0, 90)))) for place in carbonfet_thumb_15x_placements()]
 
 def carbonfet_thumb_post_tr():
     return translate(web_post(),
@@ -1181,176 +1248,154 @@ def carbonfet_thumb_post_br():
         [(mount_width / 2) - post_adj, -(mount_height / 2) + post_adj, 0]
     )
 
-def carbonfet_thumb_connectors():
-    hulls = []
+def carbonfet_thumb_connector_strips():
+    strips = []
 
     # Top two
-    hulls.append(
-        triangle_hulls(
-            [
-                carbonfet_thumb_tl_place(web_post_tl()),
-                carbonfet_thumb_tl_place(web_post_bl()),
-                carbonfet_thumb_ml_place(carbonfet_thumb_post_tr()),
-                carbonfet_thumb_ml_place(web_post_br()),
-            ]
-        )
+    strips.append(
+        [
+            thumb_place(web_post_tl(), 'tl'),
+            thumb_place(web_post_bl(), 'tl'),
+            thumb_place(carbonfet_thumb_post_tr(), 'ml'),
+            thumb_place(web_post_br(), 'ml'),
+        ]
     )
 
-    hulls.append(
-        triangle_hulls(
-            [
-                carbonfet_thumb_ml_place(carbonfet_thumb_post_tl()),
-                carbonfet_thumb_ml_place(web_post_bl()),
-                carbonfet_thumb_bl_place(carbonfet_thumb_post_tr()),
-                carbonfet_thumb_bl_place(web_post_br()),
-            ]
-        )
+    strips.append(
+        [
+            thumb_place(carbonfet_thumb_post_tl(), 'ml'),
+            thumb_place(web_post_bl(), 'ml'),
+            thumb_place(carbonfet_thumb_post_tr(), 'bl'),
+            thumb_place(web_post_br(), 'bl'),
+        ]
     )
 
     # bottom two on the right
-    hulls.append(
-        triangle_hulls(
-            [
-                carbonfet_thumb_br_place(web_post_tr()),
-                carbonfet_thumb_br_place(web_post_br()),
-                carbonfet_thumb_mr_place(web_post_tl()),
-                carbonfet_thumb_mr_place(web_post_bl()),
-            ]
-        )
+    strips.append(
+        [
+            thumb_place(web_post_tr(), 'br'),
+            thumb_place(web_post_br(), 'br'),
+            thumb_place(web_post_tl(), 'mr'),
+            thumb_place(web_post_bl(), 'mr'),
+        ]
     )
 
     # bottom two on the left
-    hulls.append(
-        triangle_hulls(
-            [
-                carbonfet_thumb_mr_place(web_post_tr()),
-                carbonfet_thumb_mr_place(web_post_br()),
-                carbonfet_thumb_tr_place(web_post_tl()),
-                carbonfet_thumb_tr_place(web_post_bl()),
-            ]
-        )
+    strips.append(
+        [
+            thumb_place(web_post_tr(), 'mr'),
+            thumb_place(web_post_br(), 'mr'),
+            thumb_place(web_post_tl(), 'tr'),
+            thumb_place(web_post_bl(), 'tr'),
+        ]
     )
-    hulls.append(
-        triangle_hulls(
-            [
-                carbonfet_thumb_tr_place(web_post_br()),
-                carbonfet_thumb_tr_place(web_post_bl()),
-                carbonfet_thumb_mr_place(web_post_br()),
-            ]
-        )
+    strips.append(
+        [
+            thumb_place(web_post_br(), 'tr'),
+            thumb_place(web_post_bl(), 'tr'),
+            thumb_place(web_post_br(), 'mr'),
+        ]
     )
 
     # between top and bottom row
-    hulls.append(
-        triangle_hulls(
-            [
-                carbonfet_thumb_br_place(web_post_tl()),
-                carbonfet_thumb_bl_place(web_post_bl()),
-                carbonfet_thumb_br_place(web_post_tr()),
-                carbonfet_thumb_bl_place(web_post_br()),
-                carbonfet_thumb_mr_place(web_post_tl()),
-                carbonfet_thumb_ml_place(web_post_bl()),
-                carbonfet_thumb_mr_place(web_post_tr()),
-                carbonfet_thumb_ml_place(web_post_br()),
-                carbonfet_thumb_tr_place(web_post_tl()),
-                carbonfet_thumb_tl_place(web_post_bl()),
-                carbonfet_thumb_tr_place(web_post_tr()),
-                carbonfet_thumb_tl_place(web_post_br()),
-            ]
-        )
+    strips.append(
+        [
+            thumb_place(web_post_tl(), 'br'),
+            thumb_place(web_post_bl(), 'bl'),
+            thumb_place(web_post_tr(), 'br'),
+            thumb_place(web_post_br(), 'bl'),
+            thumb_place(web_post_tl(), 'mr'),
+            thumb_place(web_post_bl(), 'ml'),
+            thumb_place(web_post_tr(), 'mr'),
+            thumb_place(web_post_br(), 'ml'),
+            thumb_place(web_post_tl(), 'tr'),
+            thumb_place(web_post_bl(), 'tl'),
+            thumb_place(web_post_tr(), 'tr'),
+            thumb_place(web_post_br(), 'tl'),
+        ]
     )
     # top two to the main keyboard, starting on the left
-    hulls.append(
-        triangle_hulls(
-            [
-                carbonfet_thumb_ml_place(carbonfet_thumb_post_tl()),
-                key_place(web_post_bl(), 0, cornerrow),
-                carbonfet_thumb_ml_place(carbonfet_thumb_post_tr()),
-                key_place(web_post_br(), 0, cornerrow),
-                carbonfet_thumb_tl_place(web_post_tl()),
-                key_place(web_post_bl(), 1, cornerrow),
-                carbonfet_thumb_tl_place(web_post_tr()),
-                key_place(web_post_br(), 1, cornerrow),
-                key_place(web_post_tl(), 2, lastrow),
-                key_place(web_post_bl(), 2, lastrow),
-                carbonfet_thumb_tl_place(web_post_tr()),
-                key_place(web_post_bl(), 2, lastrow),
-                carbonfet_thumb_tl_place(web_post_br()),
-                key_place(web_post_br(), 2, lastrow),
-                key_place(web_post_bl(), 3, lastrow),
-                carbonfet_thumb_tl_place(web_post_br()),
-                carbonfet_thumb_tr_place(web_post_tr()),
-            ]
-        )
+    strips.append(
+        [
+            thumb_place(carbonfet_thumb_post_tl(), 'ml'),
+            key_place(web_post_bl(), 0, cornerrow),
+            thumb_place(carbonfet_thumb_post_tr(), 'ml'),
+            key_place(web_post_br(), 0, cornerrow),
+            thumb_place(web_post_tl(), 'tl'),
+            key_place(web_post_bl(), 1, cornerrow),
+            thumb_place(web_post_tr(), 'tl'),
+            key_place(web_post_br(), 1, cornerrow),
+            key_place(web_post_tl(), 2, lastrow),
+            key_place(web_post_bl(), 2, lastrow),
+            thumb_place(web_post_tr(), 'tl'),
+            key_place(web_post_bl(), 2, lastrow),
+            thumb_place(web_post_br(), 'tl'),
+            key_place(web_post_br(), 2, lastrow),
+            key_place(web_post_bl(), 3, lastrow),
+            thumb_place(web_post_br(), 'tl'),
+            thumb_place(web_post_tr(), 'tr'),
+        ]
     )
 
-    hulls.append(
-        triangle_hulls(
-            [
-                key_place(web_post_tr(), 3, lastrow),
-                key_place(web_post_br(), 3, cornerrow),
-                key_place(web_post_tl(), 3, lastrow),
-                key_place(web_post_bl(), 3, cornerrow),
-            ]
-        )
+    strips.append(
+        [
+            key_place(web_post_tr(), 3, lastrow),
+            key_place(web_post_br(), 3, cornerrow),
+            key_place(web_post_tl(), 3, lastrow),
+            key_place(web_post_bl(), 3, cornerrow),
+        ]
     )
 
-    hulls.append(
-        triangle_hulls(
-            [
-                key_place(web_post_tr(), 2, lastrow),
-                key_place(web_post_br(), 2, lastrow),
-                key_place(web_post_tl(), 3, lastrow),
-                key_place(web_post_bl(), 3, lastrow),
-            ]
-        )
+    strips.append(
+        [
+            key_place(web_post_tr(), 2, lastrow),
+            key_place(web_post_br(), 2, lastrow),
+            key_place(web_post_tl(), 3, lastrow),
+            key_place(web_post_bl(), 3, lastrow),
+        ]
     )
 
-    hulls.append(
-        triangle_hulls(
-            [
-                carbonfet_thumb_tr_place(web_post_br()),
-                carbonfet_thumb_tr_place(web_post_tr()),
-                key_place(web_post_bl(), 3, lastrow),
-            ]
-        )
+    strips.append(
+        [
+            thumb_place(web_post_br(), 'tr'),
+            thumb_place(web_post_tr(), 'tr'),
+            key_place(web_post_bl(), 3, lastrow),
+        ]
     )
 
-    hulls.append(
-        triangle_hulls(
-            [
-                key_place(web_post_br(), 1, cornerrow),
-                key_place(web_post_tl(), 2, lastrow),
-                key_place(web_post_bl(), 2, cornerrow),
-                key_place(web_post_tr(), 2, lastrow),
-                key_place(web_post_br(), 2, cornerrow),
-                key_place(web_post_tl(), 3, lastrow),
-                key_place(web_post_bl(), 3, cornerrow),
-            ]
-        )
+    strips.append(
+        [
+            key_place(web_post_br(), 1, cornerrow),
+            key_place(web_post_tl(), 2, lastrow),
+            key_place(web_post_bl(), 2, cornerrow),
+            key_place(web_post_tr(), 2, lastrow),
+            key_place(web_post_br(), 2, cornerrow),
+            key_place(web_post_tl(), 3, lastrow),
+            key_place(web_post_bl(), 3, cornerrow),
+        ]
     )
 
-    hulls.append(
-        triangle_hulls(
-            [
-                key_place(web_post_tr(), 3, lastrow),
-                key_place(web_post_br(), 3, lastrow),
-                key_place(web_post_bl(), 4, cornerrow),
-            ]
-        )
+    strips.append(
+        [
+            key_place(web_post_tr(), 3, lastrow),
+            key_place(web_post_br(), 3, lastrow),
+            key_place(web_post_bl(), 4, cornerrow),
+        ]
     )
 
-    hulls.append(
-        triangle_hulls(
-            [
-                key_place(web_post_tr(), 3, lastrow),
-                key_place(web_post_br(), 3, cornerrow),
-                key_place(web_post_bl(), 4, cornerrow),
-            ]
-        )
+    strips.append(
+        [
+            key_place(web_post_tr(), 3, lastrow),
+            key_place(web_post_br(), 3, cornerrow),
+            key_place(web_post_bl(), 4, cornerrow),
+        ]
     )
 
-    return union(hulls)
+    return strips
+
+
+def carbonfet_thumb_connectors():
+    return triangle_hull_strips(carbonfet_thumb_connector_strips())
 
 
 ##########
@@ -1358,9 +1403,71 @@ def carbonfet_thumb_connectors():
 ##########
 
 
+# Set by wall_footprints(): bottom_hull() and wall_hull() record the floor outline of each wall
+# piece here instead of building it.
+wall_footprint_outlines = None
+
+
+def floor_outline(points):
+    # Where the hull of the points crosses the floor, if it does.
+    if np.all(points[:, 2] >= 0):
+        return None
+    points = floor_clip(points)
+    points = points[points[:, 2] == 0][:, :2]
+    try:
+        return points[sphull(points).vertices]
+    except Exception:
+        # Only touches the floor along an edge.
+        return None
+
+
+def bottom_hull_points(p, height=0.001):
+    # The points bottom_hull() hulls: the bottom of each post (all of it for OpenSCAD, which hulls the
+    # whole post) and its footprint on the floor at z = -10.  None if a post's vertices are not known.
+    if ENGINE == 'cadquery':
+        points = [np.array([vert.toTuple() for vert in item.faces('<Z').vertices().objects]) for item in p]
+        floor = [-10]
+    else:
+        points = [shape_points(item) for item in p]
+        if any(item is None for item in points):
+            return None
+        floor = [-10, height - 10]
+    points = np.vstack(points)
+    return np.vstack([points] + [np.column_stack([points[:, :2], np.full(len(points), z)]) for z in floor])
+
+
+def bottom_hull_outline(p):
+    # Where a bottom hull meets the floor, from the same points it is built from.
+    points = bottom_hull_points(p)
+    if points is None:
+        return None
+    return floor_outline(points)
+
+
+def wall_hull(shapes):
+    # hull_from_shapes() for the walls and thumb connection; wall_footprints() only records where
+    # the hull meets the floor.
+    if wall_footprint_outlines is not None:
+        outline = floor_outline(np.vstack([shape_points(item) for item in shapes]))
+        if outline is not None:
+            wall_footprint_outlines.append(outline)
+        return None
+    return hull_from_shapes(shapes)
+
+
 def bottom_hull(p, height=0.001):
     debugprint("bottom_hull()")
+    if wall_footprint_outlines is not None:
+        outline = bottom_hull_outline(p)
+        if outline is not None:
+            wall_footprint_outlines.append(outline)
+        return None
     if ENGINE == 'cadquery':
+        if floor_clamp:
+            # The chain of hulls below comes to one hull of every post and footprint.  Clipped at the
+            # floor part by part it would lose what lies between a sunken footprint and the others.
+            return hull_from_points(bottom_hull_points(p))
+
         shape = None
         for item in p:
             # proj = sl.projection()(p)
@@ -1387,22 +1494,28 @@ def bottom_hull(p, height=0.001):
                     shp.vertices()
                 except:
                     0
-            shape = union([shape, hull_from_shapes((shape, t_shape))])
+            hull = hull_from_shapes((shape, t_shape))
+            # A cached hull can come back as the very solid it was built around; fusing it onto
+            # itself adds nothing.
+            if hull.val() is not shape.val():
+                shape = union([shape, hull])
 
         return shape
 
     else:
-        shape = None
+        if polyhedron_hulls or floor_clamp:
+            points = bottom_hull_points(p, height)
+            if points is not None:
+                return hull_from_points(points)
+
+        # Project each post once and hull the posts with all of their footprints in a single node.
+        floor = []
         for item in p:
-            proj = sl.projection()(p)
             t_shape = sl.linear_extrude(height=height, twist=0, convexity=0, center=True)(
-                proj
+                sl.projection()(item)
             )
-            t_shape = sl.translate([0, 0, height / 2 - 10])(t_shape)
-            if shape is None:
-                shape = t_shape
-            shape = sl.hull()(p, shape, t_shape)
-        return shape
+            floor.append(sl.translate([0, 0, height / 2 - 10])(t_shape))
+        return sl.hull()(*p, *floor)
 
 
 def left_key_position(row, direction):
@@ -1452,6 +1565,12 @@ def wall_locate3(dx, dy, back=False):
 
 def wall_brace(place1, dx1, dy1, post1, place2, dx2, dy2, post2, back=False):
     debugprint("wall_brace()")
+    if wall_engine == 'POINTS' and wall_footprint_outlines is None:
+        shape = wall_segment_hulls(wall_end_points(place1, dx1, dy1, post1, back),
+                                   wall_end_points(place2, dx2, dy2, post2, back))
+        if shape is not None:
+            return shape
+
     hulls = []
 
     hulls.append(place1(post1))
@@ -1463,7 +1582,8 @@ def wall_brace(place1, dx1, dy1, post1, place2, dx2, dy2, post2, back=False):
     hulls.append(place2(translate(post2, wall_locate1(dx2, dy2))))
     hulls.append(place2(translate(post2, wall_locate2(dx2, dy2))))
     hulls.append(place2(translate(post2, wall_locate3(dx2, dy2, back))))
-    shape1 = hull_from_shapes(hulls)
+    # Low walls can dip below the floor above the bottom hull too.
+    shape1 = wall_hull(hulls)
 
     hulls = []
     hulls.append(place1(translate(post1, wall_locate2(dx1, dy1))))
@@ -1491,50 +1611,70 @@ def key_wall_brace(x1, y1, dx1, dy1, post1, x2, y2, dx2, dy2, post2, back=False)
     )
 
 
+def wall_end_points(place, dx, dy, post, back=False):
+    # Exact vertices at one end of a wall brace: every post from the key out to wall_locate3 for the
+    # upper hull, and what bottom_hull() takes of the two outer posts for the lower one.
+    posts = [place(translate(post, offset))
+             for offset in [[0, 0, 0], wall_locate1(dx, dy), wall_locate2(dx, dy), wall_locate3(dx, dy, back)]]
+    upper = [shape_points(item) for item in posts]
+    lower = bottom_hull_points(posts[2:])
+    if lower is None or any(item is None for item in upper):
+        return None
+    return np.vstack(upper), lower
+
+
+def wall_segment_hulls(start, end):
+    # The same two hulls wall_brace() builds, each made once from the vertices of both ends instead of
+    # from placed solids, and without the chain of hulls in bottom_hull().
+    if start is None or end is None:
+        return None
+    return union([hull_from_points(np.vstack([a, b])) for a, b in zip(start, end)])
+
+
 def back_wall():
     print("back_wall()")
-    x = 0
-    shape = union([key_wall_brace(x, 0, 0, 1, web_post_tl(), x, 0, 0, 1, web_post_tr(), back=True)])
-    for i in range(ncols - 1):
-        x = i + 1
-        shape = union([shape, key_wall_brace(x, 0, 0, 1, web_post_tl(), x, 0, 0, 1, web_post_tr(), back=True)])
-        shape = union([shape, key_wall_brace(
-            x, 0, 0, 1, web_post_tl(), x - 1, 0, 0, 1, web_post_tr(), back=True
-        )])
+    run = key_run(0, 0, 'right')
+    shape = None
+    for i, (x, y) in enumerate(run):
+        shape = union([shape, key_wall_brace(x, y, 0, 1, web_post_tl(), x, y, 0, 1, web_post_tr(), back=True)])
+        if i > 0:
+            x0, y0 = run[i - 1]
+            shape = union([shape, key_wall_brace(
+                x, y, 0, 1, web_post_tl(), x0, y0, 0, 1, web_post_tr(), back=True
+            )])
+    x, y = run[-1]
     shape = union([shape, key_wall_brace(
-        lastcol, 0, 0, 1, web_post_tr(), lastcol, 0, 1, 0, web_post_tr(), back=True
+        x, y, 0, 1, web_post_tr(), x, y, 1, 0, web_post_tr(), back=True
     )])
     return shape
 
 
 def right_wall():
     print("right_wall()")
-    y = 0
-    shape = union([
-        key_wall_brace(
-            lastcol, y, 1, 0, web_post_tr(), lastcol, y, 1, 0, web_post_br()
-        )
-    ])
-
-    for i in range(lastrow - 1):
-        y = i + 1
-        shape = union([shape,key_wall_brace(
-            lastcol, y - 1, 1, 0, web_post_br(), lastcol, y, 1, 0, web_post_tr()
-        )])
+    # The last row, if the last column has it, is walled in by the thumb cluster.
+    run = [(x, y) for x, y in key_run(lastcol, 0, 'down') if y < lastrow]
+    shape = None
+    for i, (x, y) in enumerate(run):
+        if i > 0:
+            x0, y0 = run[i - 1]
+            shape = union([shape,key_wall_brace(
+                x0, y0, 1, 0, web_post_br(), x, y, 1, 0, web_post_tr()
+            )])
 
         shape = union([shape,key_wall_brace(
-            lastcol, y, 1, 0, web_post_tr(), lastcol, y, 1, 0, web_post_br()
+            x, y, 1, 0, web_post_tr(), x, y, 1, 0, web_post_br()
         )])
         #STRANGE PARTIAL OFFSET
 
+    x, y = run[-1]
     shape = union([shape,key_wall_brace(
-        lastcol,
-        cornerrow,
+        x,
+        y,
         0,
         -1,
         web_post_br(),
-        lastcol,
-        cornerrow,
+        x,
+        y,
         1,
         0,
         web_post_br(),
@@ -1566,8 +1706,8 @@ def left_wall():
         web_post(),
     )])
 
-    for i in range(lastrow):
-        y = i
+    rows = [y for _, y in key_run(0, 0, 'down') if y < lastrow]
+    for y in rows:
         temp_shape1 = wall_brace(
             (lambda sh: left_key_place(sh, y, 1)),
             -1,
@@ -1578,7 +1718,7 @@ def left_wall():
             0,
             web_post(),
         )
-        temp_shape2 = hull_from_shapes((
+        temp_shape2 = wall_hull((
             key_place(web_post_tl(), 0, y),
             key_place(web_post_bl(), 0, y),
             left_key_place(web_post(), y, 1),
@@ -1587,10 +1727,9 @@ def left_wall():
         shape = union([shape,temp_shape1])
         shape = union([shape,temp_shape2])
 
-    for i in range(lastrow - 1):
-        y = i + 1
+    for y0, y in zip(rows[:-1], rows[1:]):
         temp_shape1 = wall_brace(
-            (lambda sh: left_key_place(sh, y - 1, -1)),
+            (lambda sh: left_key_place(sh, y0, -1)),
             -1,
             0,
             web_post(),
@@ -1599,11 +1738,11 @@ def left_wall():
             0,
             web_post(),
         )
-        temp_shape2 = hull_from_shapes((
+        temp_shape2 = wall_hull((
             key_place(web_post_tl(), 0, y),
-            key_place(web_post_bl(), 0, y - 1),
+            key_place(web_post_bl(), 0, y0),
             left_key_place(web_post(), y, 1),
-            left_key_place(web_post(), y - 1, -1),
+            left_key_place(web_post(), y0, -1),
         ))
         shape = union([shape,temp_shape1])
         shape = union([shape,temp_shape2])
@@ -1624,15 +1763,15 @@ def front_wall():
     shape = union([shape,key_wall_brace(
         3, lastrow, 0.5, -1, web_post_br(), 4, cornerrow, 1, -1, web_post_bl()
     )])
-    for i in range(ncols - 4):
-        x = i + 4
+    # Bottom keys right of the thumb cluster.
+    run = key_run(4, cornerrow, 'right') if ncols > 4 else []
+    for x, y in run:
         shape = union([shape,key_wall_brace(
-            x, cornerrow, 0, -1, web_post_bl(), x, cornerrow, 0, -1, web_post_br()
+            x, y, 0, -1, web_post_bl(), x, y, 0, -1, web_post_br()
         )])
-    for i in range(ncols - 5):
-        x = i + 5
+    for (x0, y0), (x, y) in zip(run[:-1], run[1:]):
         shape = union([shape, key_wall_brace(
-            x, cornerrow, 0, -1, web_post_bl(), x - 1, cornerrow, 0, -1, web_post_br()
+            x, y, 0, -1, web_post_bl(), x0, y0, 0, -1, web_post_br()
         )])
 
     return shape
@@ -1656,21 +1795,21 @@ def thumb_connection():
 def default_thumb_walls():
     print('thumb_walls()')
     # thumb, walls
-    shape = union([wall_brace(thumb_mr_place, 0, -1, web_post_br(), thumb_tr_place, 0, -1, thumb_post_br())])
-    shape = union([shape, wall_brace(thumb_mr_place, 0, -1, web_post_br(), thumb_mr_place, 0, -1, web_post_bl())])
-    shape = union([shape, wall_brace(thumb_br_place, 0, -1, web_post_br(), thumb_br_place, 0, -1, web_post_bl())])
-    shape = union([shape, wall_brace(thumb_ml_place, -0.3, 1, web_post_tr(), thumb_ml_place, 0, 1, web_post_tl())])
-    shape = union([shape, wall_brace(thumb_bl_place, 0, 1, web_post_tr(), thumb_bl_place, 0, 1, web_post_tl())])
-    shape = union([shape, wall_brace(thumb_br_place, -1, 0, web_post_tl(), thumb_br_place, -1, 0, web_post_bl())])
-    shape = union([shape, wall_brace(thumb_bl_place, -1, 0, web_post_tl(), thumb_bl_place, -1, 0, web_post_bl())])
+    shape = union([wall_brace(thumb_placement('mr'), 0, -1, web_post_br(), thumb_placement('tr'), 0, -1, thumb_post_br())])
+    shape = union([shape, wall_brace(thumb_placement('mr'), 0, -1, web_post_br(), thumb_placement('mr'), 0, -1, web_post_bl())])
+    shape = union([shape, wall_brace(thumb_placement('br'), 0, -1, web_post_br(), thumb_placement('br'), 0, -1, web_post_bl())])
+    shape = union([shape, wall_brace(thumb_placement('ml'), -0.3, 1, web_post_tr(), thumb_placement('ml'), 0, 1, web_post_tl())])
+    shape = union([shape, wall_brace(thumb_placement('bl'), 0, 1, web_post_tr(), thumb_placement('bl'), 0, 1, web_post_tl())])
+    shape = union([shape, wall_brace(thumb_placement('br'), -1, 0, web_post_tl(), thumb_placement('br'), -1, 0, web_post_bl())])
+    shape = union([shape, wall_brace(thumb_placement('bl'), -1, 0, web_post_tl(), thumb_placement('bl'), -1, 0, web_post_bl())])
     # thumb, corners
-    shape = union([shape, wall_brace(thumb_br_place, -1, 0, web_post_bl(), thumb_br_place, 0, -1, web_post_bl())])
-    shape = union([shape, wall_brace(thumb_bl_place, -1, 0, web_post_tl(), thumb_bl_place, 0, 1, web_post_tl())])
+    shape = union([shape, wall_brace(thumb_placement('br'), -1, 0, web_post_bl(), thumb_placement('br'), 0, -1, web_post_bl())])
+    shape = union([shape, wall_brace(thumb_placement('bl'), -1, 0, web_post_tl(), thumb_placement('bl'), 0, 1, web_post_tl())])
     # thumb, tweeners
-    shape = union([shape, wall_brace(thumb_mr_place, 0, -1, web_post_bl(), thumb_br_place, 0, -1, web_post_br())])
-    shape = union([shape, wall_brace(thumb_ml_place, 0, 1, web_post_tl(), thumb_bl_place, 0, 1, web_post_tr())])
-    shape = union([shape, wall_brace(thumb_bl_place, -1, 0, web_post_bl(), thumb_br_place, -1, 0, web_post_tl())])
-    shape = union([shape, wall_brace(thumb_tr_place, 0, -1, thumb_post_br(), (lambda sh: key_place(sh, 3, lastrow)), 0, -1, web_post_bl())])
+    shape = union([shape, wall_brace(thumb_placement('mr'), 0, -1, web_post_bl(), thumb_placement('br'), 0, -1, web_post_br())])
+    shape = union([shape, wall_brace(thumb_placement('ml'), 0, 1, web_post_tl(), thumb_placement('bl'), 0, 1, web_post_tr())])
+    shape = union([shape, wall_brace(thumb_placement('bl'), -1, 0, web_post_bl(), thumb_placement('br'), -1, 0, web_post_tl())])
+    shape = union([shape, wall_brace(thumb_placement('tr'), 0, -1, thumb_post_br(), (lambda sh: key_place(sh, 3, lastrow)), 0, -1, web_post_bl())])
 
     return shape
 
@@ -1682,50 +1821,50 @@ def default_thumb_connection():
         [
             left_key_place(translate(web_post(), wall_locate2(-1, 0)), cornerrow, -1),
             left_key_place(translate(web_post(), wall_locate3(-1, 0)), cornerrow, -1),
-            thumb_ml_place(translate(web_post_tr(), wall_locate2(-0.3, 1))),
-            thumb_ml_place(translate(web_post_tr(), wall_locate3(-0.3, 1))),
+            thumb_place(translate(web_post_tr(), wall_locate2(-0.3, 1)), 'ml'),
+            thumb_place(translate(web_post_tr(), wall_locate3(-0.3, 1)), 'ml'),
         ]
     )])
 
     shape = union([shape,
-        hull_from_shapes(
+        wall_hull(
             [
                 left_key_place(translate(web_post(), wall_locate2(-1, 0)), cornerrow, -1),
                 left_key_place(translate(web_post(), wall_locate3(-1, 0)), cornerrow, -1),
-                thumb_ml_place(translate(web_post_tr(), wall_locate2(-0.3, 1))),
-                thumb_ml_place(translate(web_post_tr(), wall_locate3(-0.3, 1))),
-                thumb_tl_place(thumb_post_tl()),
+                thumb_place(translate(web_post_tr(), wall_locate2(-0.3, 1)), 'ml'),
+                thumb_place(translate(web_post_tr(), wall_locate3(-0.3, 1)), 'ml'),
+                thumb_place(thumb_post_tl(), 'tl'),
             ]
         )
     ])  # )
 
-    shape = union([shape, hull_from_shapes(
+    shape = union([shape, wall_hull(
         [
             left_key_place(web_post(), cornerrow, -1),
             left_key_place(translate(web_post(), wall_locate1(-1, 0)), cornerrow, -1),
             left_key_place(translate(web_post(), wall_locate2(-1, 0)), cornerrow, -1),
             left_key_place(translate(web_post(), wall_locate3(-1, 0)), cornerrow, -1),
-            thumb_tl_place(thumb_post_tl()),
+            thumb_place(thumb_post_tl(), 'tl'),
         ]
     )])
 
-    shape = union([shape, hull_from_shapes(
+    shape = union([shape, wall_hull(
         [
             left_key_place(web_post(), cornerrow, -1),
             left_key_place(translate(web_post(), wall_locate1(-1, 0)), cornerrow, -1),
             key_place(web_post_bl(), 0, cornerrow),
             key_place(translate(web_post_bl(), wall_locate1(-1, 0)), 0, cornerrow),
-            thumb_tl_place(thumb_post_tl()),
+            thumb_place(thumb_post_tl(), 'tl'),
         ]
     )])
 
-    shape = union([shape, hull_from_shapes(
+    shape = union([shape, wall_hull(
         [
-            thumb_ml_place(web_post_tr()),
-            thumb_ml_place(translate(web_post_tr(), wall_locate1(-0.3, 1))),
-            thumb_ml_place(translate(web_post_tr(), wall_locate2(-0.3, 1))),
-            thumb_ml_place(translate(web_post_tr(), wall_locate3(-0.3, 1))),
-            thumb_tl_place(thumb_post_tl()),
+            thumb_place(web_post_tr(), 'ml'),
+            thumb_place(translate(web_post_tr(), wall_locate1(-0.3, 1)), 'ml'),
+            thumb_place(translate(web_post_tr(), wall_locate2(-0.3, 1)), 'ml'),
+            thumb_place(translate(web_post_tr(), wall_locate3(-0.3, 1)), 'ml'),
+            thumb_place(thumb_post_tl(), 'tl'),
         ]
     )])
 
@@ -1733,19 +1872,19 @@ def default_thumb_connection():
 
 def mini_thumb_walls():
     # thumb, walls
-    shape = union([wall_brace(mini_thumb_mr_place, 0, -1, web_post_br(), mini_thumb_tr_place, 0, -1, mini_thumb_post_br())])
-    shape = union([shape, wall_brace(mini_thumb_mr_place, 0, -1, web_post_br(), mini_thumb_mr_place, 0, -1, web_post_bl())])
-    shape = union([shape, wall_brace(mini_thumb_br_place, 0, -1, web_post_br(), mini_thumb_br_place, 0, -1, web_post_bl())])
-    shape = union([shape, wall_brace(mini_thumb_bl_place, 0, 1, web_post_tr(), mini_thumb_bl_place, 0, 1, web_post_tl())])
-    shape = union([shape, wall_brace(mini_thumb_br_place, -1, 0, web_post_tl(), mini_thumb_br_place, -1, 0, web_post_bl())])
-    shape = union([shape, wall_brace(mini_thumb_bl_place, -1, 0, web_post_tl(), mini_thumb_bl_place, -1, 0, web_post_bl())])
+    shape = union([wall_brace(thumb_placement('mr'), 0, -1, web_post_br(), thumb_placement('tr'), 0, -1, mini_thumb_post_br())])
+    shape = union([shape, wall_brace(thumb_placement('mr'), 0, -1, web_post_br(), thumb_placement('mr'), 0, -1, web_post_bl())])
+    shape = union([shape, wall_brace(thumb_placement('br'), 0, -1, web_post_br(), thumb_placement('br'), 0, -1, web_post_bl())])
+    shape = union([shape, wall_brace(thumb_placement('bl'), 0, 1, web_post_tr(), thumb_placement('bl'), 0, 1, web_post_tl())])
+    shape = union([shape, wall_brace(thumb_placement('br'), -1, 0, web_post_tl(), thumb_placement('br'), -1, 0, web_post_bl())])
+    shape = union([shape, wall_brace(thumb_placement('bl'), -1, 0, web_post_tl(), thumb_placement('bl'), -1, 0, web_post_bl())])
     # thumb, corners
-    shape = union([shape, wall_brace(mini_thumb_br_place, -1, 0, web_post_bl(), mini_thumb_br_place, 0, -1, web_post_bl())])
-    shape = union([shape, wall_brace(mini_thumb_bl_place, -1, 0, web_post_tl(), mini_thumb_bl_place, 0, 1, web_post_tl())])
+    shape = union([shape, wall_brace(thumb_placement('br'), -1, 0, web_post_bl(), thumb_placement('br'), 0, -1, web_post_bl())])
+    shape = union([shape, wall_brace(thumb_placement('bl'), -1, 0, web_post_tl(), thumb_placement('bl'), 0, 1, web_post_tl())])
     # thumb, tweeners
-    shape = union([shape, wall_brace(mini_thumb_mr_place, 0, -1, web_post_bl(), mini_thumb_br_place, 0, -1, web_post_br())])
-    shape = union([shape, wall_brace(mini_thumb_bl_place, -1, 0, web_post_bl(), mini_thumb_br_place, -1, 0, web_post_tl())])
-    shape = union([shape, wall_brace(mini_thumb_tr_place, 0, -1, mini_thumb_post_br(), (lambda sh: key_place(sh, 3, lastrow)), 0, -1, web_post_bl())])
+    shape = union([shape, wall_brace(thumb_placement('mr'), 0, -1, web_post_bl(), thumb_placement('br'), 0, -1, web_post_br())])
+    shape = union([shape, wall_brace(thumb_placement('bl'), -1, 0, web_post_bl(), thumb_placement('br'), -1, 0, web_post_tl())])
+    shape = union([shape, wall_brace(thumb_placement('tr'), 0, -1, mini_thumb_post_br(), (lambda sh: key_place(sh, 3, lastrow)), 0, -1, web_post_bl())])
 
     return shape
 
@@ -1755,51 +1894,51 @@ def mini_thumb_connection():
         [
             left_key_place(translate(web_post(), wall_locate2(-1, 0)), cornerrow, -1),
             left_key_place(translate(web_post(), wall_locate3(-1, 0)), cornerrow, -1),
-            mini_thumb_bl_place(translate(web_post_tr(), wall_locate2(-0.3, 1))),
-            mini_thumb_bl_place(translate(web_post_tr(), wall_locate3(-0.3, 1))),
+            thumb_place(translate(web_post_tr(), wall_locate2(-0.3, 1)), 'bl'),
+            thumb_place(translate(web_post_tr(), wall_locate3(-0.3, 1)), 'bl'),
         ]
     )])
 
     shape = union([shape,
-        hull_from_shapes(
+        wall_hull(
         [
             left_key_place(translate(web_post(), wall_locate2(-1, 0)), cornerrow, -1),
             left_key_place(translate(web_post(), wall_locate3(-1, 0)), cornerrow, -1),
-            mini_thumb_bl_place(translate(web_post_tr(), wall_locate2(-0.3, 1))),
-            mini_thumb_bl_place(translate(web_post_tr(), wall_locate3(-0.3, 1))),
-            mini_thumb_tl_place(web_post_tl()),
+            thumb_place(translate(web_post_tr(), wall_locate2(-0.3, 1)), 'bl'),
+            thumb_place(translate(web_post_tr(), wall_locate3(-0.3, 1)), 'bl'),
+            thumb_place(web_post_tl(), 'tl'),
         ]
     )])
 
     shape = union([shape,
-        hull_from_shapes(
+        wall_hull(
         [
             left_key_place(web_post(), cornerrow, -1),
             left_key_place(translate(web_post(), wall_locate1(-1, 0)), cornerrow, -1),
             left_key_place(translate(web_post(), wall_locate2(-1, 0)), cornerrow, -1),
             left_key_place(translate(web_post(), wall_locate3(-1, 0)), cornerrow, -1),
-            mini_thumb_tl_place(web_post_tl()),
+            thumb_place(web_post_tl(), 'tl'),
         ]
     )])
 
     shape = union([shape,
-        hull_from_shapes(
+        wall_hull(
         [
             left_key_place(web_post(), cornerrow, -1),
             left_key_place(translate(web_post(), wall_locate1(-1, 0)), cornerrow, -1),
             key_place(web_post_bl(), 0, cornerrow),
-            mini_thumb_tl_place(web_post_tl()),
+            thumb_place(web_post_tl(), 'tl'),
         ]
     )])
 
     shape = union([shape,
-        hull_from_shapes(
+        wall_hull(
         [
-            mini_thumb_bl_place(web_post_tr()),
-            mini_thumb_bl_place(translate(web_post_tr(), wall_locate1(-0.3, 1))),
-            mini_thumb_bl_place(translate(web_post_tr(), wall_locate2(-0.3, 1))),
-            mini_thumb_bl_place(translate(web_post_tr(), wall_locate3(-0.3, 1))),
-            mini_thumb_tl_place(web_post_tl()),
+            thumb_place(web_post_tr(), 'bl'),
+            thumb_place(translate(web_post_tr(), wall_locate1(-0.3, 1)), 'bl'),
+            thumb_place(translate(web_post_tr(), wall_locate2(-0.3, 1)), 'bl'),
+            thumb_place(translate(web_post_tr(), wall_locate3(-0.3, 1)), 'bl'),
+            thumb_place(web_post_tl(), 'tl'),
         ]
     )])
 
@@ -1809,19 +1948,19 @@ def mini_thumb_connection():
 
 def carbonfet_thumb_walls():
     # thumb, walls
-    shape = union([wall_brace(carbonfet_thumb_mr_place, 0, -1, web_post_br(), carbonfet_thumb_tr_place, 0, -1, web_post_br())])
-    shape = union([shape, wall_brace(carbonfet_thumb_mr_place, 0, -1, web_post_br(), carbonfet_thumb_mr_place, 0, -1.15, web_post_bl())])
-    shape = union([shape, wall_brace(carbonfet_thumb_br_place, 0, -1, web_post_br(), carbonfet_thumb_br_place, 0, -1, web_post_bl())])
-    shape = union([shape, wall_brace(carbonfet_thumb_bl_place, -.3, 1, thumb_post_tr(), carbonfet_thumb_bl_place, 0, 1, thumb_post_tl())])
-    shape = union([shape, wall_brace(carbonfet_thumb_br_place, -1, 0, web_post_tl(), carbonfet_thumb_br_place, -1, 0, web_post_bl())])
-    shape = union([shape, wall_brace(carbonfet_thumb_bl_place, -1, 0, thumb_post_tl(), carbonfet_thumb_bl_place, -1, 0, web_post_bl())])
+    shape = union([wall_brace(thumb_placement('mr'), 0, -1, web_post_br(), thumb_placement('tr'), 0, -1, web_post_br())])
+    shape = union([shape, wall_brace(thumb_placement('mr'), 0, -1, web_post_br(), thumb_placement('mr'), 0, -1.15, web_post_bl())])
+    shape = union([shape, wall_brace(thumb_placement('br'), 0, -1, web_post_br(), thumb_placement('br'), 0, -1, web_post_bl())])
+    shape = union([shape, wall_brace(thumb_placement('bl'), -.3, 1, thumb_post_tr(), thumb_placement('bl'), 0, 1, thumb_post_tl())])
+    shape = union([shape, wall_brace(thumb_placement('br'), -1, 0, web_post_tl(), thumb_placement('br'), -1, 0, web_post_bl())])
+    shape = union([shape, wall_brace(thumb_placement('bl'), -1, 0, thumb_post_tl(), thumb_placement('bl'), -1, 0, web_post_bl())])
     # thumb, corners
-    shape = union([shape, wall_brace(carbonfet_thumb_br_place, -1, 0, web_post_bl(), carbonfet_thumb_br_place, 0, -1, web_post_bl())])
-    shape = union([shape, wall_brace(carbonfet_thumb_bl_place, -1, 0, thumb_post_tl(), carbonfet_thumb_bl_place, 0, 1, thumb_post_tl())])
+    shape = union([shape, wall_brace(thumb_placement('br'), -1, 0, web_post_bl(), thumb_placement('br'), 0, -1, web_post_bl())])
+    shape = union([shape, wall_brace(thumb_placement('bl'), -1, 0, thumb_post_tl(), thumb_placement('bl'), 0, 1, thumb_post_tl())])
     # thumb, tweeners
-    shape = union([shape, wall_brace(carbonfet_thumb_mr_place, 0, -1.15, web_post_bl(), carbonfet_thumb_br_place, 0, -1, web_post_br())])
-    shape = union([shape, wall_brace(carbonfet_thumb_bl_place, -1, 0, web_post_bl(), carbonfet_thumb_br_place, -1, 0, web_post_tl())])
-    shape = union([shape, wall_brace(carbonfet_thumb_tr_place, 0, -1, web_post_br(), (lambda sh: key_place(sh, 3, lastrow)), 0, -1, web_post_bl())])
+    shape = union([shape, wall_brace(thumb_placement('mr'), 0, -1.15, web_post_bl(), thumb_placement('br'), 0, -1, web_post_br())])
+    shape = union([shape, wall_brace(thumb_placement('bl'), -1, 0, web_post_bl(), thumb_placement('br'), -1, 0, web_post_tl())])
+    shape = union([shape, wall_brace(thumb_placement('tr'), 0, -1, web_post_br(), (lambda sh: key_place(sh, 3, lastrow)), 0, -1, web_post_bl())])
     return shape
 
 def carbonfet_thumb_connection():
@@ -1830,51 +1969,51 @@ def carbonfet_thumb_connection():
         [
             left_key_place(translate(web_post(), wall_locate2(-1, 0)), cornerrow, -1),
             left_key_place(translate(web_post(), wall_locate3(-1, 0)), cornerrow, -1),
-            carbonfet_thumb_bl_place(translate(thumb_post_tr(), wall_locate2(-0.3, 1))),
-            carbonfet_thumb_bl_place(translate(thumb_post_tr(), wall_locate3(-0.3, 1))),
+            thumb_place(translate(thumb_post_tr(), wall_locate2(-0.3, 1)), 'bl'),
+            thumb_place(translate(thumb_post_tr(), wall_locate3(-0.3, 1)), 'bl'),
         ]
     )
 
     shape = union([shape,
-        hull_from_shapes(
+        wall_hull(
         [
             left_key_place(translate(web_post(), wall_locate2(-1, 0)), cornerrow, -1),
             left_key_place(translate(web_post(), wall_locate3(-1, 0)), cornerrow, -1),
-            carbonfet_thumb_bl_place(translate(thumb_post_tr(), wall_locate2(-0.3, 1))),
-            carbonfet_thumb_bl_place(translate(thumb_post_tr(), wall_locate3(-0.3, 1))),
-            carbonfet_thumb_ml_place(thumb_post_tl()),
+            thumb_place(translate(thumb_post_tr(), wall_locate2(-0.3, 1)), 'bl'),
+            thumb_place(translate(thumb_post_tr(), wall_locate3(-0.3, 1)), 'bl'),
+            thumb_place(thumb_post_tl(), 'ml'),
         ]
     )])
 
     shape = union([shape,
-        hull_from_shapes(
+        wall_hull(
         [
             left_key_place(web_post(), cornerrow, -1),
             left_key_place(translate(web_post(), wall_locate1(-1, 0)), cornerrow, -1),
             left_key_place(translate(web_post(), wall_locate2(-1, 0)), cornerrow, -1),
             left_key_place(translate(web_post(), wall_locate3(-1, 0)), cornerrow, -1),
-            carbonfet_thumb_ml_place(thumb_post_tl()),
+            thumb_place(thumb_post_tl(), 'ml'),
         ]
     )])
 
     shape = union([shape,
-        hull_from_shapes(
+        wall_hull(
         [
             left_key_place(web_post(), cornerrow, -1),
             left_key_place(translate(web_post(), wall_locate1(-1, 0)), cornerrow, -1),
             key_place(web_post_bl(), 0, cornerrow),
-            carbonfet_thumb_ml_place(thumb_post_tl()),
+            thumb_place(thumb_post_tl(), 'ml'),
         ]
     )])
 
     shape = union([shape,
-        hull_from_shapes(
+        wall_hull(
         [
-            carbonfet_thumb_bl_place(thumb_post_tr()),
-            carbonfet_thumb_bl_place(translate(thumb_post_tr(), wall_locate1(-0.3, 1))),
-            carbonfet_thumb_bl_place(translate(thumb_post_tr(), wall_locate2(-0.3, 1))),
-            carbonfet_thumb_bl_place(translate(thumb_post_tr(), wall_locate3(-0.3, 1))),
-            carbonfet_thumb_ml_place(thumb_post_tl()),
+            thumb_place(thumb_post_tr(), 'bl'),
+            thumb_place(translate(thumb_post_tr(), wall_locate1(-0.3, 1)), 'bl'),
+            thumb_place(translate(thumb_post_tr(), wall_locate2(-0.3, 1)), 'bl'),
+            thumb_place(translate(thumb_post_tr(), wall_locate3(-0.3, 1)), 'bl'),
+            thumb_place(thumb_post_tl(), 'ml'),
         ]
     )])
 
@@ -1882,16 +2021,15 @@ def carbonfet_thumb_connection():
 
 def case_walls():
     print('case_walls()')
-    return (
-        union([
-            back_wall(),
-            left_wall(),
-            right_wall(),
-            front_wall(),
-            thumb_walls(),
-            thumb_connection(),
-        ])
-    )
+    shape = union([
+        back_wall(),
+        left_wall(),
+        right_wall(),
+        front_wall(),
+        thumb_walls(),
+        thumb_connection(),
+    ])
+    return shape
 
 
 rj9_start = list(
@@ -1923,7 +2061,12 @@ def rj9_space():
 def rj9_holder():
     print('rj9_holder()')
     shape = union([translate(box(10.78, 9, 18.38), (0, 2, 0)), translate(box(10.78, 13, 5), (0, 0, 5))])
-    shape = difference(rj9_cube(), [shape])
+    outer = rj9_cube()
+    if floor_clamp:
+        # The cube reaches just under the floor; start it at z = 0 instead.
+        sink = max(22.38 / 2 - rj9_position[2], 0)
+        outer = translate(box(14.78, 13, 22.38 - sink), (0, 0, sink / 2))
+    shape = difference(outer, [shape])
     shape = translate(shape, rj9_position)
 
     return shape
@@ -2328,8 +2471,7 @@ def screw_insert_shape(bottom_radius, top_radius, height):
     return shape
 
 
-def screw_insert(column, row, bottom_radius, top_radius, height):
-    debugprint('screw_insert()')
+def screw_insert_position(column, row):
     shift_right = column == lastcol
     shift_left = column == 0
     shift_up = (not (shift_right or shift_left)) and (row == 0)
@@ -2380,13 +2522,10 @@ def screw_insert(column, row, bottom_radius, top_radius, height):
             row,
         )
 
+    return position
 
-    shape = screw_insert_shape(bottom_radius, top_radius, height)
-    shape = translate(shape, [position[0], position[1], height / 2])
-
-    return shape
 
-def screw_insert_thumb(bottom_radius, top_radius, height):
+def screw_insert_thumb_position():
     if thumb_style == 'MINI':
         position = thumborigin()
         position = list(np.array(position) + np.array([-29, -51, -16]))
@@ -2402,41 +2541,72 @@ def screw_insert_thumb(bottom_radius, top_radius, height):
         position = list(np.array(position) + np.array([-21, -58, 0]))
         position[2] = 0
 
-    shape = screw_insert_shape(bottom_radius, top_radius, height)
-    shape = translate(shape, [position[0], position[1], height / 2])
-    return shape
+    return position
 
-def screw_insert_all_shapes(bottom_radius, top_radius, height, offset=0):
-    print('screw_insert_all_shapes()')
-    shape = (
-        translate(screw_insert(0, 0, bottom_radius, top_radius, height), (0, 0, offset)),
-        translate(screw_insert(0, lastrow-1, bottom_radius, top_radius, height), (0, 0, offset)),
-        translate(screw_insert(3, lastrow, bottom_radius, top_radius, height), (0, 0, offset)),
-        translate(screw_insert(3, 0, bottom_radius, top_radius, height), (0,0, offset)),
-        translate(screw_insert(lastcol, 0, bottom_radius, top_radius, height), (0, 0, offset)),
-        translate(screw_insert(lastcol, lastrow-1, bottom_radius, top_radius, height), (0, 0, offset)),
-        translate(screw_insert_thumb(bottom_radius, top_radius, height), (0, 0, offset)),
-    )
 
-    return shape
+screw_insert_position_cache = {}
+
+
+def screw_insert_positions():
+    # The same for every insert profile, so computed once per configuration.
+    key = config_key()
+    if key not in screw_insert_position_cache:
+        screw_insert_position_cache.clear()
+        screw_insert_position_cache[key] = np.array([
+            screw_insert_position(0, 0),
+            screw_insert_position(0, lastrow-1),
+            screw_insert_position(3, lastrow),
+            screw_insert_position(3, 0),
+            screw_insert_position(lastcol, 0),
+            screw_insert_position(lastcol, lastrow-1),
+            screw_insert_thumb_position(),
+        ])
+    return screw_insert_position_cache[key]
+
+
+screw_insert_profiles = {}
+screw_insert_shapes = {}
 
 
+def screw_insert_profile(bottom_radius, top_radius, height):
+    # One insert standing on the floor at the origin; every position is an instance of it.
+    key = (bottom_radius, top_radius, height)
+    if key not in screw_insert_profiles:
+        screw_insert_profiles[key] = translate(screw_insert_shape(bottom_radius, top_radius, height), [0, 0, height / 2])
+    return screw_insert_profiles[key]
 
 
-def screw_insert_holes():
+def screw_insert_all_shapes(bottom_radius, top_radius, height, offset=0, fused=False):
+    print('screw_insert_all_shapes()')
+    # Positions follow the configuration, the profile does not.
+    key = (bottom_radius, top_radius, height, offset, config_key())
+    if key not in screw_insert_shapes:
+        shape = screw_insert_profile(bottom_radius, top_radius, height)
+        screw_insert_shapes[key] = tuple(
+            instance(shape, (position[0], position[1], offset)) for position in screw_insert_positions()
+        )
+    if not fused:
+        return screw_insert_shapes[key]
+    if key + ('fused',) not in screw_insert_shapes:
+        screw_insert_shapes[key + ('fused',)] = union(screw_insert_shapes[key])
+    return screw_insert_shapes[key + ('fused',)]
+
+
+def screw_insert_holes(fused=False):
     return screw_insert_all_shapes(
-        screw_insert_bottom_radius, screw_insert_top_radius, screw_insert_height+.02, offset=-.01
+        screw_insert_bottom_radius, screw_insert_top_radius, screw_insert_height+.02, offset=-.01, fused=fused
     )
 
-def screw_insert_outers():
+def screw_insert_outers(fused=False):
     return screw_insert_all_shapes(
         screw_insert_bottom_radius + 1.6,
         screw_insert_top_radius + 1.6,
         screw_insert_height + 1.5,
+        fused=fused,
     )
 
-def screw_insert_screw_holes():
-    return screw_insert_all_shapes(1.7, 1.7, 350)
+def screw_insert_screw_holes(fused=False):
+    return screw_insert_all_shapes(1.7, 1.7, 350, fused=fused)
 
 
 
@@ -2465,97 +2635,394 @@ def wire_post(direction, offset):
 
 def wire_posts():
     debugprint('wire_posts()')
-    shape = thumb_ml_place(wire_post(1, 0).translate([-5, 0, -2]))
-    shape = union([shape, thumb_ml_place(wire_post(-1, 6).translate([0, 0, -2.5]))])
-    shape = union([shape, thumb_ml_place(wire_post(1, 0).translate([5, 0, -2]))])
-
-    for column in range(lastcol):
-        for row in range(lastrow - 1):
-            shape = union([
-                shape,
-                key_place(wire_post(1, 0).translate([-5, 0, 0]), column, row),
-                key_place(wire_post(-1, 6).translate([0, 0, 0]), column, row),
-                key_place(wire_post(1, 0).translate([5, 0, 0]), column, row),
-            ])
-    return shape
+    shape = thumb_place(wire_post(1, 0).translate([-5, 0, -2]), 'ml')
+    shape = union([shape, thumb_place(wire_post(-1, 6).translate([0, 0, -2.5]), 'ml')])
+    shape = union([shape, thumb_place(wire_post(1, 0).translate([5, 0, -2]), 'ml')])
 
+    layout = key_layout()
+    for key in layout[(layout['column'] >= 0) & (layout['column'] < lastcol) & (layout['row'] < lastrow - 1)]:
+        shape = union([
+            shape,
+            transform(wire_post(1, 0).translate([-5, 0, 0]), key['transform']),
+            transform(wire_post(-1, 6).translate([0, 0, 0]), key['transform']),
+            transform(wire_post(1, 0).translate([5, 0, 0]), key['transform']),
+        ])
+    return shape
 
-def model_side(side="right"):
-    print('model_right()')
-    shape = union([key_holes(side=side)])
-    if debug_exports:
-        export_file(shape=shape, fname=path.join(r"..", "things", r"debug_key_plates"))
-    connector_shape = connectors()
-    shape = union([shape, connector_shape])
-    if debug_exports:
-        export_file(shape=shape, fname=path.join(r"..", "things", r"debug_connector_shape"))
-    thumb_shape = thumb(side=side)
-    if debug_exports:
-        export_file(shape=thumb_shape, fname=path.join(r"..", "things", r"debug_thumb_shape"))
-    shape = union([shape, thumb_shape])
-    thumb_connector_shape = thumb_connectors()
-    shape = union([shape, thumb_connector_shape])
-    if debug_exports:
-        export_file(shape=shape, fname=path.join(r"..", "things", r"debug_thumb_connector_shape"))
-    walls_shape = case_walls()
-    if debug_exports:
-        export_file(shape=walls_shape, fname=path.join(r"..", "things", r"debug_walls_shape"))
-    s2 = union([walls_shape])
-    s2 = union([s2, *screw_insert_outers()])
 
+def model_stage(name, side="right", plates=True):
+    # Independent pieces of model_side(), built separately so they can run in worker processes.
+    if name == 'key_holes':
+        if not plates:
+            return None
+        return union([key_holes(side=side)])
+    if name == 'connectors':
+        return connectors()
+    if name == 'thumb':
+        return thumb(side=side, plates=plates)
+    if name == 'thumb_connectors':
+        return thumb_connectors()
+    if name == 'case_walls':
+        return case_walls()
+    if name == 'screw_insert_outers':
+        return screw_insert_outers(fused=True)
+    if name == 'screw_insert_holes':
+        return screw_insert_holes(fused=True)
+    if name == 'teensy_holder':
+        return teensy_holder()
+    if name == 'usb_holder':
+        return usb_holder()
+    if name == 'usb_holder_hole':
+        return usb_holder_hole()
+    if name == 'rj9_space':
+        return rj9_space()
+    if name == 'rj9_holder':
+        return rj9_holder()
+    if name == 'external_mount_hole':
+        return external_mount_hole()
+    if name == 'oled_mount_frame':
+        if oled_mount_type == "UNDERCUT":
+            return oled_undercut_mount_frame()
+        elif oled_mount_type == "SLIDING":
+            return oled_sliding_mount_frame()
+        elif oled_mount_type == "CLIP":
+            return oled_clip_mount_frame()
+    raise ValueError('Unknown model stage: {}'.format(name))
+
+
+def model_stage_names():
+    # Slowest stages first so they start before the pool fills up.
+    names = ['case_walls', 'connectors', 'thumb_connectors', 'key_holes', 'thumb',
+             'screw_insert_outers', 'screw_insert_holes']
     if controller_mount_type in ['RJ9_USB_TEENSY', 'USB_TEENSY']:
-        s2 = union([s2, teensy_holder()])
-
+        names.append('teensy_holder')
     if controller_mount_type in ['RJ9_USB_TEENSY', 'RJ9_USB_WALL', 'USB_WALL', 'USB_TEENSY']:
-        s2 = union([s2, usb_holder()])
-        s2 = difference(s2, [usb_holder_hole()])
-
+        names += ['usb_holder', 'usb_holder_hole']
     if controller_mount_type in ['RJ9_USB_TEENSY', 'RJ9_USB_WALL']:
-        s2 = difference(s2, [rj9_space()])
-
+        names += ['rj9_space', 'rj9_holder']
     if controller_mount_type in ['EXTERNAL']:
-        s2 = difference(s2, [external_mount_hole()])
+        names.append('external_mount_hole')
+    if oled_mount_type in ["UNDERCUT", "SLIDING", "CLIP"]:
+        names.append('oled_mount_frame')
+    return names
+
+
+def stage_booleans(name):
+    # Booleans inside the block use the boolean_stages settings for name.
+    return boolean_stage(name, boolean_stages.get(name))
+
+
+def model_stage_booleans(name):
+    if name in ['key_holes', 'connectors', 'thumb', 'thumb_connectors']:
+        return 'connectors'
+    if name in ['rj9_holder', 'oled_mount_frame']:
+        return 'body'
+    return 'walls'
+
+
+def stage_worker_config():
+    # The configuration this process runs with, handed to the stage workers.  A worker started
+    # with 'spawn' would otherwise only see run_config.json, not settings changed since (benchmark.py,
+    # sweep.py).  Each stage worker builds its connector hulls itself, no nested pools.
+    config = {name: globals()[name] for name in cfg.shape_config if name in globals()}
+    config['hull_workers'] = 1
+    return config, helpers.worker_settings()
+
+
+def setup_stage_worker(config, settings):
+    globals().update(config)
+    helpers.apply_worker_settings(settings)
+
+
+def build_model_stage(name, side, plates):
+    # Worker entry point.  Shapes go back to the parent as BREP.
+    with stage_booleans(model_stage_booleans(name)):
+        shape = model_stage(name, side, plates)
+    if shape is None:
+        return None
+    if isinstance(shape, tuple):
+        return tuple(serialize_shape(item) for item in shape)
+    return serialize_shape(shape)
+
+
+def build_model_stages(side, plates=True):
+    print('build_model_stages()')
+    from concurrent.futures import ProcessPoolExecutor
+    names = model_stage_names()
+    with ProcessPoolExecutor(max_workers=parallel_workers, initializer=setup_stage_worker,
+                             initargs=stage_worker_config()) as pool:
+        futures = {name: pool.submit(build_model_stage, name, side, plates) for name in names}
+        stages = {}
+        for name in names:
+            data = futures[name].result()
+            if data is None:
+                stages[name] = None
+            elif isinstance(data, tuple):
+                stages[name] = tuple(deserialize_shape(item) for item in data)
+            else:
+                stages[name] = deserialize_shape(data)
+    return stages
+
+
+def model_side(side="right", plates=True):
+    # plates=False leaves out the key plates and caps, which model_assembly() places as instances.
+    print('model_right()')
+    if parallel_build and ENGINE == 'cadquery':
+        stages = build_model_stages(side, plates)
 
-    if controller_mount_type in ['None']:
-        0 # do nothing, only here to expressly state inaction.
+        def stage(name):
+            return stages[name]
+    else:
+        def stage(name):
+            with stage_booleans(model_stage_booleans(name)):
+                return model_stage(name, side, plates)
+
+    with stage_booleans('connectors'):
+        shape = stage('key_holes')
+        if debug_exports:
+            export_file(shape=shape, fname=path.join(r"..", "things", r"debug_key_plates"))
+        connector_shape = stage('connectors')
+        shape = union([shape, connector_shape])
+        if simplify_stages:
+            shape = simplify(shape, 'connectors')
+        if debug_exports:
+            export_file(shape=shape, fname=path.join(r"..", "things", r"debug_connector_shape"))
+        thumb_shape = stage('thumb')
+        if debug_exports:
+            export_file(shape=thumb_shape, fname=path.join(r"..", "things", r"debug_thumb_shape"))
+        shape = union([shape, thumb_shape])
+        thumb_connector_shape = stage('thumb_connectors')
+        shape = union([shape, thumb_connector_shape])
+        if debug_exports:
+            export_file(shape=shape, fname=path.join(r"..", "things", r"debug_thumb_connector_shape"))
+    with stage_booleans('walls'):
+        walls_shape = stage('case_walls')
+        if debug_exports:
+            export_file(shape=walls_shape, fname=path.join(r"..", "things", r"debug_walls_shape"))
+        s2 = union([walls_shape])
+        s2 = union([s2, stage('screw_insert_outers')])
+
+        if controller_mount_type in ['RJ9_USB_TEENSY', 'USB_TEENSY']:
+            s2 = union([s2, stage('teensy_holder')])
+
+        if controller_mount_type in ['RJ9_USB_TEENSY', 'RJ9_USB_WALL', 'USB_WALL', 'USB_TEENSY']:
+            s2 = union([s2, stage('usb_holder')])
+            s2 = difference(s2, [stage('usb_holder_hole')])
+
+        if controller_mount_type in ['RJ9_USB_TEENSY', 'RJ9_USB_WALL']:
+            s2 = difference(s2, [stage('rj9_space')])
+
+        if controller_mount_type in ['EXTERNAL']:
+            s2 = difference(s2, [stage('external_mount_hole')])
+
+        if controller_mount_type in ['None']:
+            0 # do nothing, only here to expressly state inaction.
+
+        s2 = difference(s2, [stage('screw_insert_holes')])
+        if simplify_stages:
+            s2 = simplify(s2, 'case walls')
+
+    with stage_booleans('body'):
+        shape = union([shape, s2])
+
+        if controller_mount_type in ['RJ9_USB_TEENSY', 'RJ9_USB_WALL']:
+            shape = union([shape, stage('rj9_holder')])
+
+        if oled_mount_type in ["UNDERCUT", "SLIDING", "CLIP"]:
+            hole, frame = stage('oled_mount_frame')
+            shape = difference(shape, [hole])
+            shape = union([shape, frame])
+
+        if floor_clamp:
+            # Hulls are clipped as they are built and every other part stands on the floor, so there
+            # is nothing to cut.  Anything still below z = 0 is a part the clamp does not cover.
+            if below_floor(shape):
+                raise ValueError('floor_clamp: geometry below the floor, build with floor_clamp off')
+        else:
+            block = box(350, 350, 40)
+            block = translate(block, (0, 0, -20))
+            shape = difference(shape, [block])
 
-    s2 = difference(s2, [union(screw_insert_holes())])
-    shape = union([shape, s2])
+        if simplify_stages:
+            shape = simplify(shape, 'body')
 
-    if controller_mount_type in ['RJ9_USB_TEENSY', 'RJ9_USB_WALL']:
-        shape = union([shape, rj9_holder()])
+    if show_caps and plates:
+        shape = add([shape, thumbcaps()])
+        shape = add([shape, caps()])
 
-    if oled_mount_type == "UNDERCUT":
-        hole, frame = oled_undercut_mount_frame()
-        shape = difference(shape, [hole])
-        shape = union([shape, frame])
+    if side == "left":
+        shape = mirror(shape, 'YZ')
 
-    elif oled_mount_type == "SLIDING":
-        hole, frame = oled_sliding_mount_frame()
-        shape = difference(shape, [hole])
-        shape = union([shape, frame])
+    return shape
 
-    elif oled_mount_type == "CLIP":
-        hole, frame = oled_clip_mount_frame()
-        shape = difference(shape, [hole])
-        shape = union([shape, frame])
 
-    block = box(350, 350, 40)
-    block = translate(block, (0, 0, -20))
-    shape = difference(shape, [block])
+def model_assembly(side="right"):
+    # The side as assembly parts: the case body, plus one plate and one cap per size, each placed
+    # at every key.  Placements on the left side are mirrored into rigid ones, with mirrored parts.
+    mirrored = side == "left"
+    body = model_side(side=side, plates=False)
+    plate = single_plate(side=side)
+    layout = key_layout()
+
+    # model_side() cuts the oled hole and the floor after the plates are in.  A plate one of those
+    # reaches is cut the same way and becomes a part of its own; the rest stay instances.
+    tools = []
+    if oled_mount_type in ["UNDERCUT", "SLIDING", "CLIP"]:
+        with stage_booleans('body'):
+            tools.append(model_stage('oled_mount_frame', side, False)[0])
+    if not floor_clamp:
+        tools.append(translate(box(350, 350, 40), (0, 0, -20)))
+    locations = []
+    cut_plates = []
+    for matrix in layout['transform']:
+        placed = transform(plate, matrix)
+        touching = [tool for tool in tools if boxes_overlap(placed, tool)]
+        if touching:
+            with stage_booleans('body'):
+                placed = difference(placed, touching)
+            cut_plates.append(mirror(placed, 'YZ') if mirrored else placed)
+        else:
+            locations.append(matrix_location(matrix, mirrored))
+    if mirrored:
+        plate = mirror(plate, 'YZ')
+    parts = [('body', body, None), ('plate', plate, locations)]
+    parts += [('plate_cut_{}'.format(i), item, None) for i, item in enumerate(cut_plates)]
 
     if show_caps:
-        shape = add([shape, thumbcaps()])
-        shape = add([shape, caps()])
+        for size in dict.fromkeys(layout['size']):
+            cap = sa_cap(size)
+            if mirrored:
+                cap = mirror(cap, 'YZ')
+            locations = [matrix_location(matrix, mirrored) for matrix in layout['cap_transform'][layout['size'] == size]]
+            parts.append(('cap_{:g}u'.format(size), cap, locations))
+
+    return parts
+
+
+def verify_floor_clamp(side="right"):
+    # Build the side with the floor cut and with floor_clamp, and compare the two.
+    global floor_clamp, parallel_build
+    saved = floor_clamp, parallel_build
+    # Pool workers read run_config.json, so both builds stay in this process.
+    parallel_build = False
+    shapes = []
+    for clamp in [False, True]:
+        floor_clamp = clamp
+        helpers.floor_clamp = clamp
+        shapes.append(model_side(side=side))
+    floor_clamp, parallel_build = saved
+    helpers.floor_clamp = floor_clamp
+    cut, clamped = shapes
 
-    if side == "left":
-        shape = mirror(shape, 'YZ')
+    if ENGINE == 'cadquery':
+        extra = sum(item.Volume() for item in difference(clamped, [cut]).vals())
+        missing = sum(item.Volume() for item in difference(cut, [clamped]).vals())
+        print('floor_clamp verify: {:.3f} mm3 cut, {:.3f} mm3 clamped, {:.3f} extra, {:.3f} missing'.format(
+            sum(item.Volume() for item in cut.vals()), sum(item.Volume() for item in clamped.vals()), extra, missing))
+    else:
+        # No geometry kernel here; write both for comparison in OpenSCAD.
+        export_file(shape=cut, fname=path.join(save_path, config_name + r"_floor_cut"))
+        export_file(shape=clamped, fname=path.join(save_path, config_name + r"_floor_clamp"))
+        print('floor_clamp verify: compare {0}_floor_cut and {0}_floor_clamp'.format(config_name))
+
+
+def wall_footprints():
+    # Floor outlines of the wall bottoms, taken from the wall points without building the walls.
+    global wall_footprint_outlines
+    wall_footprint_outlines = []
+    try:
+        for walls in [back_wall, left_wall, right_wall, front_wall, thumb_walls, thumb_connection]:
+            walls()
+        return wall_footprint_outlines
+    finally:
+        wall_footprint_outlines = None
+
+
+def plate_from_wires(outer_wire, inner_wire, holes):
+    # inner_plate = cq.Workplane('XY').add(cq.Face.makeFromWires(inner_wire))
 
+    inner_shape = cq.Workplane('XY').add(cq.Solid.extrudeLinear(inner_wire, [], cq.Vector(0, 0, base_thickness)))
+    inner_shape = translate(inner_shape, (0, 0, -base_rim_thickness))
+
+    cutout = [*holes, inner_wire]
+
+    shape = cq.Workplane('XY').add(cq.Solid.extrudeLinear(outer_wire, cutout, cq.Vector(0, 0, base_rim_thickness)))
+    hole_shapes=[]
+    for hole in holes:
+        loc = hole.Center()
+        hole_shapes.append(
+            translate(
+                cylinder(screw_cbore_diameter, screw_cbore_depth),
+                (loc.x, loc.y, 0)
+                # (loc.x, loc.y, screw_cbore_depth/2)
+            )
+        )
+    shape = difference(shape, hole_shapes)
+    shape = translate(shape, (0, 0, -base_rim_thickness))
+    shape = union([shape, inner_shape])
     return shape
 
 
+plate_outline_cache = {}
+
+
+def plate_outline():
+    # Wall footprint outlines and screw insert centers, shared by the FOOTPRINT baseplate and the
+    # direct DXF plates.  Kept for the current configuration only.
+    key = config_key()
+    if key not in plate_outline_cache:
+        plate_outline_cache.clear()
+        plate_outline_cache[key] = (wall_footprints(), [position[:2] for position in screw_insert_positions()])
+    return plate_outline_cache[key]
+
+
+def footprint_baseplate():
+    # The plate outline straight from the wall footprints and screw insert positions, instead of a
+    # section through the finished walls.
+    print('footprint_baseplate()')
+    outlines, centers = plate_outline()
+    outer_radius = screw_insert_bottom_radius + 1.6
+
+    if ENGINE == 'cadquery':
+        def polygon_face(points):
+            return cq.Face.makeFromWires(cq.Wire.makePolygon([cq.Vector(x, y, 0) for x, y in points], close=True))
+
+        def circle_face(radius, center):
+            return cq.Face.makeFromWires(cq.Wire.makeCircle(radius, cq.Vector(center[0], center[1], 0), cq.Vector(0, 0, 1)))
+
+        faces = [polygon_face(outline) for outline in outlines]
+        faces += [circle_face(outer_radius, center) for center in centers]
+        face = faces[0].fuse(*faces[1:])
+        face = face.cut(*[circle_face(screw_hole_diameter / 2., center) for center in centers]).clean()
+        face = max(face.Faces(), key=lambda item: item.Area())
+
+        inner_wires = face.innerWires()
+        inner_wire = max(inner_wires, key=lambda wire: cq.Face.makeFromWires(wire).Area())
+        holes = [wire for wire in inner_wires if not wire.isSame(inner_wire)]
+        return plate_from_wires(face.outerWire(), inner_wire, holes)
+
+    else:
+        shape = sl.union()(
+            *[sl.polygon(np.round(outline, 6).tolist()) for outline in outlines],
+            *[sl.translate(list(center))(sl.circle(r=outer_radius, segments=100)) for center in centers],
+        )
+        holes = [sl.translate(list(center))(sl.circle(r=screw_hole_diameter / 2., segments=100)) for center in centers]
+        return sl.difference()(shape, *holes)
+
+
+def plate_dxf_entities():
+    # The same plate as footprint_baseplate(), unioned in numpy for helpers_dxf.
+    outlines, centers = plate_outline()
+    outer_radius = screw_insert_bottom_radius + 1.6
+    loops = outline_loops(list(outlines) + [circle_points(center, outer_radius) for center in centers])
+    return loops, [(center, screw_hole_diameter / 2.) for center in centers]
+
+
 # NEEDS TO BE SPECIAL FOR CADQUERY
 def baseplate():
+    if baseplate_engine == 'FOOTPRINT':
+        return footprint_baseplate()
+
     if ENGINE == 'cadquery':
         # shape = mod_r
         shape = union([case_walls(), *screw_insert_outers()])
@@ -2593,32 +3060,12 @@ def baseplate():
         debugprint(sizes)
         inner_wire = base_wires[inner_index]
 
-        # inner_plate = cq.Workplane('XY').add(cq.Face.makeFromWires(inner_wire))
-
-        inner_shape = cq.Workplane('XY').add(cq.Solid.extrudeLinear(outerWire=inner_wire, innerWires=[], vecNormal=cq.Vector(0, 0, base_thickness)))
-        inner_shape = translate(inner_shape, (0, 0, -base_rim_thickness))
-
         holes = []
         for i in range(len(base_wires)):
             if i not in [inner_index, outer_index]:
                 holes.append(base_wires[i])
-        cutout = [*holes, inner_wire]
-
-        shape = cq.Workplane('XY').add(cq.Solid.extrudeLinear(outer_wire, cutout, cq.Vector(0, 0, base_rim_thickness)))
-        hole_shapes=[]
-        for hole in holes:
-            loc = hole.Center()
-            hole_shapes.append(
-                translate(
-                    cylinder(screw_cbore_diameter, screw_cbore_depth),
-                    (loc.x, loc.y, 0)
-                    # (loc.x, loc.y, screw_cbore_depth/2)
-                )
-            )
-        shape = difference(shape, hole_shapes)
-        shape = translate(shape, (0, 0, -base_rim_thickness))
-        shape = union([shape, inner_shape])
 
+        shape = plate_from_wires(outer_wire, inner_wire, holes)
 
         return shape
     else:
@@ -2628,7 +3075,7 @@ def baseplate():
             *screw_insert_outers()
         ])
 
-        tool = translate(union(screw_insert_screw_holes()), [0, 0, -10])
+        tool = translate(screw_insert_screw_holes(fused=True), [0, 0, -10])
 
         shape = shape - tool
 
@@ -2636,26 +3083,104 @@ def baseplate():
 
         return sl.projection(cut=True)(shape)
 
+def key_skeleton():
+    # Every switch of both sides from key_layout(), for the skeleton engine where
+    # a shape is a 4x4 transform: center of the plate top, its normal, and the plate rotation.
+    layout = key_layout()
+    flip = np.diag([-1., 1., 1., 1.])
+    keys = []
+    for side in ['right', 'left']:
+        for key in layout:
+            matrix = key['transform']
+            column, row = (int(key['column']), int(key['row'])) if key['column'] >= 0 else (None, None)
+            size = float(key['size'])
+            if side == 'left':
+                # The left side is the right one mirrored, a mirrored plate at a rigid placement.
+                matrix = flip @ matrix @ flip
+            keys.append({
+                'id': str(key['id']), 'side': side, 'column': column, 'row': row,
+                'cap_size': int(size) if size.is_integer() else size,
+                'center': list(matrix[:3, :3] @ [0, 0, plate_thickness] + matrix[:3, 3]),
+                'normal': list(matrix[:3, 2]),
+                'rotation': matrix[:3, :3].tolist(),
+            })
+    return keys
+
+
+def key_boxes():
+    # Oriented boxes around the cap, plate and switch body of every right side key, for
+    # helpers_collisions.  Skeleton engine only: placements are matrices, batched under sweep.py.
+    grid = [('c{}r{}'.format(column, row), 1, place, place) for (column, row), place in zip(key_grid(), key_placements())]
+    thumbs = [('thumb{}'.format(i), size, place, cap_place) for i, ((size, cap_place), place)
+              in enumerate(zip(thumb_cap_placements(), thumb_plate_placements()))]
+    switch_box = ([0, 0, plate_thickness - switch_body_depth / 2],
+                  [keyswitch_width / 2, keyswitch_height / 2, switch_body_depth / 2])
+    plate_box = ([0, 0, plate_thickness / 2], [mount_width / 2, mount_height / 2, plate_thickness / 2])
+    names, kinds, keys, matrices, half = [], [], [], [], []
+    for key, (name, size, place, cap_place) in enumerate(grid + thumbs):
+        plate, cap = place(np.eye(4)), cap_place(np.eye(4))
+        boxes = [('cap', cap, box) for box in sa_cap_boxes(size)]
+        for kind, matrix, (center, extents) in boxes + [('plate', plate, plate_box), ('switch', plate, switch_box)]:
+            names.append(name)
+            kinds.append(kind)
+            keys.append(key)
+            matrices.append(matrix @ translate(np.eye(4), center))
+            half.append(extents)
+    matrices = np.stack(np.broadcast_arrays(*matrices), axis=-3)
+    return names, kinds, keys, matrices, np.array(half, dtype=float)
+
+
 def run():
+    if ENGINE == 'skeleton':
+        export_skeleton(key_skeleton(), fname=path.join(save_path, config_name + r"_keys"))
+        collision_report(*key_boxes())
+        return
+
+    if ENGINE == 'cadquery':
+        clear_hull_cache()
+        clear_bbox_cull_stats()
+        clear_boolean_stage_times()
+
+    if floor_clamp_verify:
+        verify_floor_clamp()
 
-    mod_r = model_side(side="right")
-    export_file(shape=mod_r, fname=path.join(save_path, config_name + r"_right"))
+    if step_assembly and ENGINE == 'cadquery':
+        parts = model_assembly(side="right")
+        export_assembly(parts, fname=path.join(save_path, config_name + r"_right_assembly"))
 
-    if symmetry == "asymmetric":
-        mod_l = model_side(side="left")
-        export_file(shape=mod_l, fname=path.join(save_path, config_name + r"_left"))
+        if symmetry == "asymmetric":
+            parts = model_assembly(side="left")
+
+        else:
+            parts = mirror_assembly(parts)
+        export_assembly(parts, fname=path.join(save_path, config_name + r"_left_assembly"))
 
     else:
-        export_file(shape=mirror(mod_r, 'YZ'), fname=path.join(save_path, config_name + r"_left"))
+        mod_r = model_side(side="right")
+        export_file(shape=mod_r, fname=path.join(save_path, config_name + r"_right"))
+
+        if symmetry == "asymmetric":
+            mod_l = model_side(side="left")
+            export_file(shape=mod_l, fname=path.join(save_path, config_name + r"_left"))
+
+        else:
+            export_file(shape=mirror(mod_r, 'YZ'), fname=path.join(save_path, config_name + r"_left"))
 
 
     base = baseplate()
     export_file(shape=base, fname=path.join(save_path, config_name + r"_right_plate"))
-    export_dxf(shape=base, fname=path.join(save_path, config_name + r"_right_plate"))
+    if plate_dxf == 'DIRECT':
+        loops, circles = plate_dxf_entities()
+        write_dxf(path.join(save_path, config_name + r"_right_plate"), loops, circles)
+    else:
+        export_dxf(shape=base, fname=path.join(save_path, config_name + r"_right_plate"))
 
     lbase = mirror(base, 'YZ')
     export_file(shape=lbase, fname=path.join(save_path, config_name + r"_left_plate"))
-    export_dxf(shape=lbase, fname=path.join(save_path, config_name + r"_left_plate"))
+    if plate_dxf == 'DIRECT':
+        write_dxf(path.join(save_path, config_name + r"_left_plate"), loops, circles, mirror=True)
+    else:
+        export_dxf(shape=lbase, fname=path.join(save_path, config_name + r"_left_plate"))
 
     if oled_mount_type == 'UNDERCUT':
         export_file(shape=oled_undercut_mount_frame()[1], fname=path.join(save_path, config_name + r"_oled_undercut_test"))
@@ -2672,6 +3197,11 @@ def run():
         export_file(shape=union((oled_clip_mount_frame()[1], oled_clip())),
                             fname=path.join(save_path, config_name + r"_oled_clip_assy_test"))
 
+    if ENGINE == 'cadquery':
+        print(hull_cache_report())
+        print(bbox_cull_report())
+        print(boolean_stage_report())
+
 # base = baseplate()
 # export_file(shape=base, fname=path.join(save_path, config_name + r"_plate"))
 if __name__ == '__main__':
@@ -9,6 +9,31 @@ shape_config = {
 
     'ENGINE': 'solid', # 'solid' = solid python / OpenSCAD, 'cadquery' = cadquery / OpenCascade
     # 'ENGINE':  'cadquery', # 'solid' = solid python / OpenSCAD, 'cadquery' = cadquery / OpenCascade
+    # 'ENGINE':  'skeleton', # key positions and orientations only, written as JSON / CSV, no CAD
+    'scad_modules': True,  # solid only: write repeated sub-trees once as OpenSCAD modules instead of inlining every copy
+    'polyhedron_hulls': False,  # solid only: compute hulls with scipy and write polyhedron() instead of hull()
+    'parallel_build': False,  # cadquery only: build the independent parts of each half in a process pool, assemble in the parent
+    'parallel_workers': None,  # process pool size for parallel_build, None = one per CPU
+    'hull_workers': 1,  # cadquery only: worker processes for connector hulls, 1 = build in this process
+    'hull_cache': True,  # cadquery only: reuse hulls built from the same set of points
+    'experimental_strip_solids': False,  # cadquery only, EXPERIMENTAL: each connector strip as one solid from the post centre lines instead of fused hulls; thinner, about 3.4% less connector volume
+    'bbox_culling': True,  # cadquery only: skip booleans between solids whose bounding boxes don't overlap
+    'floor_clamp': False,  # clamp hulls at z=0 as they are built instead of cutting the finished model at the floor
+    'floor_clamp_verify': False,  # build each side both ways first and report how far apart they are
+    'simplify_stages': False,  # cadquery only: merge coplanar faces and collinear edges after the major unions
+    'export_formats': [],  # also written by every export: cadquery 'BREP', 'STL', '3MF', 'GLTF'; solid 'STL', '3MF' via OpenSCAD
+    'export_tolerance': 0.05,  # cadquery only: mesh deflection in mm for STL / 3MF / GLTF
+    'export_angular_tolerance': 0.2,  # cadquery only: mesh angular deflection in radians
+    'step_assembly': False,  # cadquery only: write each side as a STEP assembly, plates and caps placed as shared instances
+    # cadquery only: OCCT boolean options per stage.  parallel = multi-threaded booleans, fuzzy = tolerance
+    # in mm for near-coincident faces (0 = off), glue = 'OFF', 'SHIFT' or 'FULL' when fusing shapes that only share
+    # faces (an error if they overlap; cuts ignore it).  Booleans that report problems with fuzzy or glue are redone
+    # without them.
+    'boolean_stages': {
+        'connectors': {'parallel': True, 'fuzzy': 0.0, 'glue': 'OFF'},
+        'walls': {'parallel': True, 'fuzzy': 0.0, 'glue': 'OFF'},
+        'body': {'parallel': True, 'fuzzy': 0.0, 'glue': 'OFF'},
+    },
 
 
     ######################
@@ -65,6 +90,7 @@ shape_config = {
     'extra_width':  2.5,  # extra space between the base of keys# original= 2
     'extra_height':  1.0,  # original= 0.5
 
+    'wall_engine':  'HULL',  # 'HULL' = hull the placed post solids of every wall segment, 'POINTS' = the same hulls, built straight from the post vertices (faster, same walls)
     'wall_z_offset':  15,  # length of the first downward_sloping part of the wall
     'wall_x_offset':  5,  # offset in the x and/or y direction for the first downward_sloping part of the wall (negative)
     'wall_y_offset':  6,  # offset in the x and/or y direction for the first downward_sloping part of the wall (negative)
@@ -115,6 +141,7 @@ shape_config = {
     'sa_profile_key_height':  12.7,
     'sa_length': 18.25,
     'sa_double_length': 37.5,
+    'switch_body_depth': 5.0,  # switch housing below the plate top, for the skeleton engine collision check
     'plate_thickness':  4+1.1,
 
     'plate_rim': 1.5 + 0.5,
@@ -240,6 +267,8 @@ shape_config = {
     ###################################
     # COMMON DIMENSION
     'screw_hole_diameter': 2,
+    'baseplate_engine': 'SECTION',  # 'SECTION' = cut through the finished walls, 'FOOTPRINT' = outline from the wall footprint points in 2D
+    'plate_dxf': 'ENGINE',  # 'ENGINE' = export the plate solid (cadquery only), 'DIRECT' = write outlines from the wall footprints, both engines
     # USED FOR CADQUERY ONLY
     'base_thickness': 3.0, # thickness in the middle of the plate
     'base_offset': 3.0, # Both start flat/flush on the bottom.  This offsets the base up (if positive)
@@ -1,10 +1,58 @@
 import cadquery as cq
 from scipy.spatial import ConvexHull as sphull
 import numpy as np
+import io
+import os
+import time
+from contextlib import contextmanager
+from OCP.Bnd import Bnd_Box
+from OCP.BRepBndLib import BRepBndLib
+from OCP.ShapeUpgrade import ShapeUpgrade_UnifySameDomain
+from OCP.BOPAlgo import BOPAlgo_BOP, BOPAlgo_GlueEnum, BOPAlgo_Operation
+from OCP.Message import Message_Gravity
+from OCP.BRepMesh import BRepMesh_IncrementalMesh
+from OCP.gp import gp_Trsf
 
 
 debug_trace = False
 
+# Hulls are cached on their rounded, de-duplicated vertex set so repeated hulls are built only once.
+hull_cache_enabled = True
+hull_cache_decimals = 6
+hull_cache_solids = {}
+hull_cache_stats = {'hits': 0, 'misses': 0}
+
+# Experimental, not a speed setting: build triangle_hulls() strips as one sewn polyhedral solid
+# instead of fused triple hulls.  Each post is reduced to its centre line, so the strip is a
+# different, thinner shape than the hulls (connectors about 3.4% less volume).  Off by default.
+experimental_strip_solids = False
+
+# Compare bounding boxes before a boolean; solids that cannot touch are not handed to OCCT at all.
+bbox_culling = True
+bbox_cull_stats = {'skipped': 0, 'run': 0}
+
+# OCCT boolean options, swapped per stage of the build by boolean_stage().  fuzzy is a tolerance
+# in mm for near-coincident faces, glue 'SHIFT' or 'FULL' speeds up fusing shapes that only share
+# faces.  A boolean that reports errors or warnings with fuzzy or glue set is redone without them.
+boolean_options = {'parallel': True, 'fuzzy': 0.0, 'glue': 'OFF'}
+boolean_stage_name = 'other'
+boolean_stage_times = {}
+boolean_fallbacks = {}
+glue_modes = {
+    'OFF': BOPAlgo_GlueEnum.BOPAlgo_GlueOff,
+    'SHIFT': BOPAlgo_GlueEnum.BOPAlgo_GlueShift,
+    'FULL': BOPAlgo_GlueEnum.BOPAlgo_GlueFull,
+}
+
+# Written by export_file() next to the STEP: 'BREP', 'STL' (binary), '3MF', 'GLTF' (binary .glb).
+# Tolerances are the absolute mesh deflection in mm and the angular deflection in radians.
+export_formats = []
+export_tolerance = 0.05
+export_angular_tolerance = 0.2
+
+# Clamp hull points at the floor (z = 0) as they are built, so the model needs no final floor cut.
+floor_clamp = False
+
 def debugprint(info):
     if debug_trace:
         print(info)
@@ -27,31 +75,162 @@ def cone(r1, r2, height):
         cq.Solid.makeCone(radius1=r1, radius2=r2, height=height))
 
 
+# The transforms and booleans below work on the shapes and return a new Workplane holding only the
+# result, so no chain of intermediates stays reachable through .parent.
 def rotate(shape, angle):
-    origin = (0, 0, 0)
-    shape = shape.rotate(axisStartPoint=origin, axisEndPoint=(1, 0, 0), angleDegrees=angle[0])
-    shape = shape.rotate(axisStartPoint=origin, axisEndPoint=(0, 1, 0), angleDegrees=angle[1])
-    shape = shape.rotate(axisStartPoint=origin, axisEndPoint=(0, 0, 1), angleDegrees=angle[2])
-    return shape
+    origin = cq.Vector(0, 0, 0)
+    items = []
+    for item in shape.vals():
+        item = item.rotate(origin, cq.Vector(1, 0, 0), angle[0])
+        item = item.rotate(origin, cq.Vector(0, 1, 0), angle[1])
+        item = item.rotate(origin, cq.Vector(0, 0, 1), angle[2])
+        items.append(item)
+    return cq.Workplane('XY').newObject(items)
 
 
 def translate(shape, vector):
-    return shape.translate(tuple(vector))
+    vector = cq.Vector(tuple(vector))
+    return cq.Workplane('XY').newObject([item.translate(vector) for item in shape.vals()])
+
+
+def instance(shape, vector):
+    # A moved copy that shares the geometry of shape, rather than a transformed copy of it.
+    location = cq.Location(cq.Vector(*[float(item) for item in vector]))
+    return cq.Workplane('XY').newObject([item.moved(location) for item in shape.vals()])
 
 
 def mirror(shape, plane=None):
     debugprint('mirror()')
-    return shape.mirror(mirrorPlane=plane)
+    return cq.Workplane('XY').newObject(shape.mirror(mirrorPlane=plane).vals())
+
+
+def bounding_box(shape):
+    # Loose box from the geometry rather than a mesh; good enough to rule out contact.
+    box = Bnd_Box()
+    BRepBndLib.Add_s(shape.wrapped, box, False)
+    return box
+
+
+def boxes_overlap(shape, other):
+    # False only when no box of shape meets a box of other, so the two cannot touch.
+    return not all(bounding_box(a).IsOut(bounding_box(b)) for a in shape.vals() for b in other.vals())
+
+
+def shape_solids(shape):
+    solids = []
+    for item in shape.vals():
+        solids.extend(item.Solids() or [item])
+    return solids
+
+
+@contextmanager
+def boolean_stage(name, options=None):
+    # Booleans inside the block run with options on top of the current ones and are timed as name.
+    global boolean_options, boolean_stage_name
+    saved = boolean_options, boolean_stage_name
+    boolean_options = dict(boolean_options, **(options or {}))
+    boolean_stage_name = name
+    try:
+        yield
+    finally:
+        boolean_options, boolean_stage_name = saved
+
+
+def run_boolean(operation, args, tools, options):
+    # BOPAlgo_BOP rather than BRepAlgoAPI, which OCP binds without the error and warning report.
+    op = BOPAlgo_BOP()
+    for item in args:
+        op.AddArgument(item.wrapped)
+    for item in tools:
+        op.AddTool(item.wrapped)
+    op.SetOperation(operation)
+    op.SetRunParallel(options['parallel'])
+    if options['fuzzy'] or options['glue'] != 'OFF':
+        # Fuzzy and glue runs may be redone exactly, so they must leave the arguments (shared
+        # through the hull cache and placed instances) as they were: tolerances included.
+        op.SetNonDestructive(True)
+    if options['fuzzy']:
+        op.SetFuzzyValue(options['fuzzy'])
+    op.SetGlue(glue_modes[options['glue']])
+    op.Perform()
+    return op
+
+
+def boolean_alerts(op):
+    alerts = []
+    for gravity in [Message_Gravity.Message_Fail, Message_Gravity.Message_Warning]:
+        alerts.extend(alert.GetMessageKey() for alert in op.GetReport().GetAlerts(gravity))
+    return alerts
+
+
+def boolean(operation, args, tools):
+    start = time.perf_counter()
+    options = boolean_options
+    if operation != BOPAlgo_Operation.BOPAlgo_FUSE:
+        # The arguments of a cut or common overlap by nature; glue only applies to fusing.
+        options = dict(options, glue='OFF')
+    glue = options['glue'] != 'OFF'
+    op = run_boolean(operation, args, tools, options)
+    if (op.HasErrors() or op.HasWarnings()) and (glue or options['fuzzy']):
+        # Fuzzy merging can swallow thin features; OCCT says so in warnings.  Redo it exactly.
+        boolean_fallbacks[boolean_stage_name] = boolean_fallbacks.get(boolean_stage_name, 0) + 1
+        glue = False
+        op = run_boolean(operation, args, tools, dict(options, fuzzy=0.0, glue='OFF'))
+    if op.HasErrors():
+        raise RuntimeError('boolean failed in stage {}: {}'.format(boolean_stage_name, ', '.join(boolean_alerts(op))))
+    shape = cq.Shape.cast(op.Shape()).clean()
+    if glue:
+        # Glue assumes the arguments do not overlap, and OCCT reports nothing when they do; shapes
+        # that only share faces keep their total volume.
+        volume = sum(item.Volume() for item in list(args) + list(tools))
+        if abs(shape.Volume() - volume) > 1e-6 * volume:
+            raise ValueError("glue '{}' in stage {}: the shapes overlap, use glue 'OFF'".format(
+                options['glue'], boolean_stage_name))
+    times = boolean_stage_times.setdefault(boolean_stage_name, [0, 0.0])
+    times[0] += 1
+    times[1] += time.perf_counter() - start
+    return shape
+
+
+def clear_boolean_stage_times():
+    boolean_stage_times.clear()
+    boolean_fallbacks.clear()
+
+
+def boolean_stage_report():
+    return 'booleans: ' + ', '.join('{} {} in {:.2f} s{}'.format(
+        name, count, seconds, ', {} redone exactly'.format(boolean_fallbacks[name]) if name in boolean_fallbacks else '')
+        for name, (count, seconds) in boolean_stage_times.items())
+
+
+def fuse(shape, tool):
+    # Workplane.union() without the Workplane: the first solid fused with all the others.
+    solids = shape_solids(shape) + shape_solids(tool)
+    if len(solids) == 1:
+        return cq.Workplane('XY').newObject(solids)
+    return cq.Workplane('XY').newObject([boolean(BOPAlgo_Operation.BOPAlgo_FUSE, solids[:1], solids[1:])])
+
+
+def cut(shape, tool):
+    tools = [item for item in tool.vals() if isinstance(item, cq.Shape)]
+    return cq.Workplane('XY').newObject([boolean(BOPAlgo_Operation.BOPAlgo_CUT, shape_solids(shape), tools)])
 
 
 def union(shapes):
     debugprint('union()')
     shape = None
     for item in shapes:
+        if item is None:
+            continue
         if shape is None:
             shape = item
+        elif bbox_culling and not boxes_overlap(shape, item):
+            # Nothing to fuse, the two only need to end up in the same compound.
+            bbox_cull_stats['skipped'] += 1
+            shape = cq.Workplane('XY').newObject([cq.Compound.makeCompound(shape_solids(shape) + shape_solids(item))])
         else:
-            shape = shape.union(item)
+            bbox_cull_stats['run'] += 1
+            shape = fuse(shape, item)
     return shape
 
 
@@ -62,19 +241,84 @@ def add(shapes):
         if shape is None:
             shape = item
         else:
-            shape = shape.add(item)
+            shape = cq.Workplane('XY').newObject(shape.vals() + item.vals())
     return shape
 
 
+def culled_cut(shape, tool):
+    # Cut each solid of the target only by the tool solids whose boxes overlap it.
+    targets = shape_solids(shape)
+    tools = shape_solids(tool)
+    boxes = [bounding_box(item) for item in tools]
+    touching = []
+    for target in targets:
+        box = bounding_box(target)
+        touching.append([item for item, other in zip(tools, boxes) if not box.IsOut(other)])
+    if not any(touching):
+        bbox_cull_stats['skipped'] += 1
+        return shape
+    bbox_cull_stats['run'] += 1
+    if len(targets) == 1 and len(touching[0]) == len(tools):
+        return cut(shape, tool)
+    solids = []
+    for target, items in zip(targets, touching):
+        if items:
+            solids.extend(boolean(BOPAlgo_Operation.BOPAlgo_CUT, [target], items).Solids())
+        else:
+            solids.append(target)
+    if len(solids) == 1:
+        return cq.Workplane('XY').newObject(solids)
+    return cq.Workplane('XY').newObject([cq.Compound.makeCompound(solids)])
+
+
 def difference(shape, shapes):
     debugprint('difference()')
     for item in shapes:
-        shape = shape.cut(item)
+        if bbox_culling:
+            shape = culled_cut(shape, item)
+        else:
+            shape = cut(shape, item)
+    return shape
+
+
+def below_floor(shape, tolerance=1e-3):
+    return any(bounding_box(item).CornerMin().Z() < -tolerance for item in shape.vals())
+
+
+def face_edge_counts(shape):
+    return sum(len(item.Faces()) for item in shape.vals()), sum(len(item.Edges()) for item in shape.vals())
+
+
+def simplify(shape, label='', linear_tolerance=1e-5, angular_tolerance=1e-6):
+    # Hull faces are triangles, and clean() only merges faces that are exactly coplanar, so
+    # slivers of the same plane survive every boolean.  Unify them within a small tolerance.
+    before = face_edge_counts(shape)
+    items = []
+    for item in shape.vals():
+        upgrader = ShapeUpgrade_UnifySameDomain(item.wrapped, True, True, True)
+        upgrader.AllowInternalEdges(False)
+        upgrader.SetLinearTolerance(linear_tolerance)
+        upgrader.SetAngularTolerance(angular_tolerance)
+        upgrader.Build()
+        items.append(cq.Shape.cast(upgrader.Shape()))
+    shape = cq.Workplane('XY').newObject(items)
+    after = face_edge_counts(shape)
+    print('simplify {}: {} faces, {} edges -> {} faces, {} edges'.format(label, before[0], before[1], after[0], after[1]))
     return shape
 
 
+def clear_bbox_cull_stats():
+    bbox_cull_stats['skipped'] = 0
+    bbox_cull_stats['run'] = 0
+
+
+def bbox_cull_report():
+    return 'bbox culling: {} booleans skipped, {} run'.format(bbox_cull_stats['skipped'], bbox_cull_stats['run'])
+
+
 def intersect(shape1, shape2):
-    return shape1.intersect(shape2)
+    tools = [item for item in shape2.vals() if isinstance(item, cq.Shape)]
+    return cq.Workplane('XY').newObject([boolean(BOPAlgo_Operation.BOPAlgo_COMMON, shape_solids(shape1), tools)])
 
 
 def face_from_points(points):
@@ -96,8 +340,50 @@ def face_from_points(points):
     return face
 
 
+def clear_hull_cache():
+    hull_cache_solids.clear()
+    hull_cache_stats['hits'] = 0
+    hull_cache_stats['misses'] = 0
+
+
+def hull_cache_report():
+    total = hull_cache_stats['hits'] + hull_cache_stats['misses']
+    rate = 100. * hull_cache_stats['hits'] / total if total else 0.
+    return 'hull cache: {} hits, {} misses, {:.1f}% hit rate'.format(
+        hull_cache_stats['hits'], hull_cache_stats['misses'], rate)
+
+
+def floor_clip(points):
+    # Points whose hull is the part of the original hull above z = 0: the points above, plus where
+    # each segment from a point above to one below crosses the floor.
+    above = points[points[:, 2] >= 0]
+    below = points[points[:, 2] < 0]
+    if len(below) == 0:
+        return points
+    t = above[:, None, 2] / (above[:, None, 2] - below[None, :, 2])
+    crossings = above[:, None, :] + t[:, :, None] * (below[None, :, :] - above[:, None, :])
+    crossings[:, :, 2] = 0
+    return np.vstack([above, crossings.reshape(-1, 3)])
+
+
 def hull_from_points(points):
     # debugprint('hull_from_points()')
+    # np.unique sorts the rows, so the same set of points gives the same key in any order.
+    # The hull itself is built from the unrounded points; rounding can upset later booleans.
+    points = np.array(points, dtype=float)
+    if floor_clamp:
+        points = floor_clip(points)
+        # Nothing of it above the floor.
+        if len(points) == 0 or np.all(points[:, 2] == 0):
+            return None
+    rounded, index = np.unique(np.round(points, hull_cache_decimals), axis=0, return_index=True)
+    points = points[index]
+    key = rounded.tobytes()
+    if hull_cache_enabled and key in hull_cache_solids:
+        hull_cache_stats['hits'] += 1
+        return cq.Workplane('XY').newObject([hull_cache_solids[key]])
+    hull_cache_stats['misses'] += 1
+
     hull_calc = sphull(points)
     n_faces = len(hull_calc.simplices)
 
@@ -109,8 +395,9 @@ def hull_from_points(points):
             fpnts.append(points[item])
         faces.append(face_from_points(fpnts))
 
-    shape = cq.Solid.makeSolid(cq.Shell.makeShell(faces))
-    shape = cq.Workplane('XY').union(shape)
+    shape = cq.Workplane('XY').newObject([cq.Solid.makeSolid(cq.Shell.makeShell(faces)).clean()])
+    if hull_cache_enabled:
+        hull_cache_solids[key] = shape.val()
     return shape
 
 
@@ -118,12 +405,17 @@ def hull_from_shapes(shapes, points=None):
     # debugprint('hull_from_shapes()')
     vertices = []
     for shape in shapes:
+        # Hulls clamped entirely onto the floor come back as None.
+        if shape is None:
+            continue
         verts = shape.vertices()
         for vert in verts.objects:
             vertices.append(np.array(vert.toTuple()))
     if points is not None:
         for point in points:
             vertices.append(np.array(point))
+    if len(vertices) == 0:
+        return None
 
     shape = hull_from_points(vertices)
     return shape
@@ -146,8 +438,78 @@ def tess_hull(shapes, sl_tol=.5, sl_angTol=1):
     return shape
 
 
+def post_segment(points):
+    # A web post is a thin box; reduce it to the segment along its long axis.
+    center = points.mean(axis=0)
+    _, _, vt = np.linalg.svd(points - center)
+    axis = vt[0]
+    along = (points - center) @ axis
+    across = np.abs((points - center) @ vt[1])
+    if along.max() - along.min() < 4 * across.max():
+        return None
+    return center + along.max() * axis, center + along.min() * axis
+
+
+def strip_solid(strip):
+    # One watertight solid over an ordered strip of posts, close to the union of the hulls of each
+    # consecutive triple but built from the post centre lines, so without the post thickness.
+    # Returns None when the strip is degenerate or folds over itself.
+    if len(strip) < 3:
+        return None
+    segments = [post_segment(points) for points in strip]
+    if any(segment is None for segment in segments):
+        return None
+    top = np.array([segment[0] for segment in segments])
+    bottom = np.array([segment[1] for segment in segments])
+    axis = top[0] - bottom[0]
+    swap = (top - bottom) @ axis < 0
+    top[swap], bottom[swap] = bottom[swap], top[swap].copy()
+    axis = (top - bottom).mean(axis=0)
+
+    n = len(strip)
+    triangles = []
+    for i in range(n - 2):
+        if i % 2 == 0:
+            triangles.append((i, i + 1, i + 2))
+        else:
+            triangles.append((i + 1, i, i + 2))
+    # Boundary of the strip, in the same direction as the triangle winding.
+    loop = [0] + list(range(1, n, 2)) + list(range(n - 1 - (n - 1) % 2, 0, -2))
+
+    normals = [np.cross(top[b] - top[a], top[c] - top[a]) for a, b, c in triangles]
+    signs = np.array([np.dot(normal, axis) for normal in normals])
+    areas = np.array([np.linalg.norm(normal) for normal in normals])
+    if np.any(areas < 1e-6) or not (np.all(signs > 0) or np.all(signs < 0)):
+        return None
+    if signs[0] < 0:
+        triangles = [(a, c, b) for a, b, c in triangles]
+        loop = loop[::-1]
+
+    faces = []
+    for a, b, c in triangles:
+        faces.append(face_from_points([top[a], top[b], top[c]]))
+        faces.append(face_from_points([bottom[a], bottom[c], bottom[b]]))
+    for i in range(len(loop)):
+        a = loop[i]
+        b = loop[(i + 1) % len(loop)]
+        faces.append(face_from_points([top[b], top[a], bottom[a]]))
+        faces.append(face_from_points([top[b], bottom[a], bottom[b]]))
+
+    try:
+        shape = cq.Solid.makeSolid(cq.Shell.makeShell(faces))
+    except Exception:
+        return None
+    if not shape.isValid() or shape.Volume() <= 0:
+        return None
+    return cq.Workplane('XY').newObject([shape])
+
+
 def triangle_hulls(shapes):
     debugprint('triangle_hulls()')
+    if experimental_strip_solids:
+        shape = strip_solid([shape_points(item) for item in shapes])
+        if shape is not None:
+            return shape
     hulls = [cq.Workplane('XY')]
     for i in range(len(shapes) - 2):
         hulls.append(hull_from_shapes(shapes[i: (i + 3)]))
@@ -155,6 +517,38 @@ def triangle_hulls(shapes):
     return union(hulls)
 
 
+def shape_points(shape):
+    return np.array([vert.toTuple() for vert in shape.vertices().objects])
+
+
+def triangle_hulls_chunk(strips):
+    # Worker side of parallel_triangle_hulls: hull and fuse a run of strips given as vertex arrays.
+    hulls = [cq.Workplane('XY')]
+    for strip in strips:
+        if experimental_strip_solids:
+            shape = strip_solid(strip)
+            if shape is not None:
+                hulls.append(shape)
+                continue
+        for i in range(len(strip) - 2):
+            hulls.append(hull_from_points(np.vstack(strip[i: (i + 3)])))
+    return serialize_shape(union(hulls))
+
+
+def parallel_triangle_hulls(strips, workers):
+    debugprint('parallel_triangle_hulls()')
+    from concurrent.futures import ProcessPoolExecutor
+    strips = [[shape_points(shape) for shape in places] for places in strips]
+    # Contiguous chunks keep neighbouring hulls together, so most of the fusing happens in the workers.
+    size = -(-len(strips) // workers)
+    chunks = [strips[i: i + size] for i in range(0, len(strips), size)]
+    # Settings go to the workers explicitly, a spawned worker only has the module defaults.
+    with ProcessPoolExecutor(max_workers=workers, initializer=apply_worker_settings,
+                             initargs=(worker_settings(),)) as pool:
+        results = list(pool.map(triangle_hulls_chunk, chunks))
+    return union([deserialize_shape(data) for data in results])
+
+
 def polyline(point_list):
     return cq.Workplane('XY').polyline(point_list)
 
@@ -172,24 +566,155 @@ def extrude_poly(outer_poly, inner_polys=None, height=1):  # vector=(0,0,1)):
         for item in inner_polys:
             inner_wires.append(cq.Wire.assembleEdges(item.edges().objects))
 
-    return cq.Workplane('XY').add(
-        cq.Solid.extrudeLinear(outerWire=outer_wires, innerWires=inner_wires, vecNormal=cq.Vector(0, 0, height)))
+    return cq.Workplane('XY').newObject([cq.Solid.extrudeLinear(outer_wires, inner_wires, cq.Vector(0, 0, height))])
+
+
+# Imported files by path, with the (mtime, size) of the STEP they were read from.
+import_cache = {}
 
 
 def import_file(fname):
-    print("IMPORTING FROM {}".format(fname))
-    return cq.Workplane('XY').add(cq.importers.importShape(
-        cq.exporters.ExportTypes.STEP,
-        fname + ".step"))
+    # Each STEP is parsed once per process.  A .brep copy is kept next to it and read instead
+    # while it is newer than the STEP, which is several times faster than parsing STEP.
+    step_file = fname + ".step"
+    brep_file = fname + ".brep"
+    stat = os.stat(step_file)
+    stamp = (stat.st_mtime_ns, stat.st_size)
+    cached = import_cache.get(step_file)
+    if cached is None or cached[0] != stamp:
+        if os.path.exists(brep_file) and os.stat(brep_file).st_mtime_ns >= stat.st_mtime_ns:
+            print("IMPORTING FROM {}".format(brep_file))
+            shape = cq.Shape.importBrep(brep_file)
+        else:
+            print("IMPORTING FROM {}".format(fname))
+            shape = cq.importers.importShape(cq.exporters.ExportTypes.STEP, step_file).val()
+            shape.exportBrep(brep_file)
+        cached = import_cache[step_file] = (stamp, shape)
+    # Helpers never modify a shape in place, so every caller can share the one read from disk.
+    return cq.Workplane('XY').newObject([cached[1]])
 
 
 def export_file(shape, fname):
     print("EXPORTING TO {}".format(fname))
     cq.exporters.export(w=shape, fname=fname + ".step",
                         exportType='STEP')
+    if export_formats:
+        export_extra_formats(shape, fname)
+
+
+def export_extra_formats(shape, fname):
+    items = shape.vals() if isinstance(shape, cq.Workplane) else [shape]
+    shape = items[0] if len(items) == 1 else cq.Compound.makeCompound(items)
+    meshed = False
+    for export_format in export_formats:
+        if export_format in ['STL', '3MF', 'GLTF'] and not meshed:
+            # One tessellation, faces meshed in parallel, reused by every mesh writer below.
+            BRepMesh_IncrementalMesh(shape.wrapped, export_tolerance, False, export_angular_tolerance, True)
+            meshed = True
+        if export_format == 'BREP':
+            shape.exportBrep(fname + ".brep")
+        elif export_format == 'STL':
+            shape.exportStl(fname + ".stl", export_tolerance, export_angular_tolerance, relative=False)
+        elif export_format == '3MF':
+            cq.exporters.export(shape, fname + ".3mf", exportType='3MF',
+                                tolerance=export_tolerance, angularTolerance=export_angular_tolerance)
+        elif export_format == 'GLTF':
+            cq.Assembly(shape).save(fname + ".glb", exportType='GLTF',
+                                    tolerance=export_tolerance, angularTolerance=export_angular_tolerance)
+        else:
+            print("NO {} EXPORT FOR CADQUERY".format(export_format))
+
+
+def transform(shape, matrix):
+    # shape moved by a 4x4 rigid transform, such as a placement from key_layout().
+    location = matrix_location(matrix)
+    return cq.Workplane('XY').newObject([item.moved(location) for item in shape.vals()])
+
+
+def matrix_location(matrix, mirrored=False):
+    # mirrored conjugates the transform with the YZ mirror, for a mirrored part on the mirrored side.
+    matrix = np.asarray(matrix, dtype=float)
+    if mirrored:
+        flip = np.diag([-1., 1., 1., 1.])
+        matrix = flip @ matrix @ flip
+    location = gp_Trsf()
+    location.SetValues(*matrix[:3].ravel())
+    return cq.Location(location)
+
+
+def location_matrix(location):
+    trsf = location.wrapped.Transformation()
+    matrix = np.eye(4)
+    for i in range(3):
+        for j in range(4):
+            matrix[i, j] = trsf.Value(i + 1, j + 1)
+    return matrix
+
+
+def place_instances(shape, matrices):
+    # shape at every placement, as located references to the one solid rather than copies of it.
+    items = shape.vals()
+    shape = items[0] if len(items) == 1 else cq.Compound.makeCompound(items)
+    return cq.Workplane('XY').newObject([cq.Compound.makeCompound(
+        [shape.moved(matrix_location(matrix)) for matrix in matrices])])
+
+
+def export_assembly(parts, fname):
+    # parts are (name, shape, locations).  A shape with locations is stored once and referenced
+    # at each of them, so repeated plates and caps cost one solid each in the file.
+    print("EXPORTING TO {}".format(fname))
+    assembly = cq.Assembly(name=os.path.basename(fname))
+    for name, shape, locations in parts:
+        items = shape.vals()
+        shape = items[0] if len(items) == 1 else cq.Compound.makeCompound(items)
+        if locations is None:
+            assembly.add(shape, name=name)
+        else:
+            for i, location in enumerate(locations):
+                assembly.add(shape, name='{}_{}'.format(name, i), loc=location)
+    assembly.save(fname + ".step", exportType='STEP')
+
+
+def mirror_assembly(parts):
+    # The YZ mirror of assembly parts: every shape mirrored, every location conjugated to match.
+    mirrored = []
+    for name, shape, locations in parts:
+        if locations is not None:
+            locations = [matrix_location(location_matrix(location), mirrored=True) for location in locations]
+        mirrored.append((name, mirror(shape, 'YZ'), locations))
+    return mirrored
 
 
 def export_dxf(shape, fname):
     print("EXPORTING TO {}".format(fname))
     cq.exporters.export(w=shape, fname=fname + ".dxf",
-                        exportType='DXF')
\ No newline at end of file
+                        exportType='DXF')
+
+
+def serialize_shape(shape):
+    # BREP bytes, used to move shapes between processes.
+    items = shape.vals()
+    if len(items) == 1:
+        item = items[0]
+    else:
+        item = cq.Compound.makeCompound(items)
+    stream = io.BytesIO()
+    item.exportBrep(stream)
+    return stream.getvalue()
+
+
+def deserialize_shape(data):
+    return cq.Workplane('XY').add(cq.Shape.importBrep(io.BytesIO(data)))
+
+
+# Module settings a worker process needs to build shapes the way this process does.
+worker_setting_names = ['hull_cache_enabled', 'hull_cache_decimals', 'experimental_strip_solids', 'bbox_culling',
+                        'floor_clamp', 'boolean_options', 'boolean_stage_name']
+
+
+def worker_settings():
+    return {name: globals()[name] for name in worker_setting_names}
+
+
+def apply_worker_settings(settings):
+    globals().update(settings)
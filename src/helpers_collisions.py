@@ -0,0 +1,108 @@
+import numpy as np
+
+# Clearance between oriented boxes, for checking caps, plates and switch bodies against each other
+# without building them.  A box is a 4x4 placement of its center and axes plus three half extents.
+# Placements may carry leading batch dimensions (one per sweep.py candidate), half extents do not.
+
+# Kinds of box checked against each other.  Neighbouring plates touch by design and a switch sits
+# in a plate, so plate/plate and plate/switch are left out.
+collision_kinds = [('cap', 'cap'), ('cap', 'plate'), ('cap', 'switch'), ('switch', 'switch')]
+
+
+def box_pairs(kinds, keys):
+    # Index pairs of boxes to check: allowed kinds, and not two boxes of the same key.
+    names = sorted(set(kinds))
+    kind = np.array([names.index(item) for item in kinds])
+    allowed = np.zeros((len(names), len(names)), dtype=bool)
+    for a, b in collision_kinds:
+        if a in names and b in names:
+            allowed[names.index(a), names.index(b)] = allowed[names.index(b), names.index(a)] = True
+    first, second = np.triu_indices(len(kinds), 1)
+    keys = np.asarray(keys)
+    keep = allowed[kind[first], kind[second]] & (keys[first] != keys[second])
+    return np.stack([first[keep], second[keep]], axis=-1)
+
+
+def key_sphere_gaps(matrices, half, pairs, keys):
+    # Gaps between spheres around all the boxes of each key, per box pair.  Most pairs are between
+    # keys far apart, and this settles them with one distance per pair of keys.
+    keys = np.unique(keys, return_inverse=True)[1]
+    centers = matrices[..., :3, 3]
+    members = np.eye(keys.max() + 1)[keys].T
+    key_centers = np.einsum('kb,...bj->...kj', members / members.sum(axis=1, keepdims=True), centers)
+    reach = np.linalg.norm(centers - key_centers[..., keys, :], axis=-1) + np.linalg.norm(half, axis=-1)
+    key_radius = np.stack([reach[..., keys == key].max(axis=-1) for key in range(len(members))], axis=-1)
+    codes, inverse = np.unique(keys[pairs[:, 0]] * len(members) + keys[pairs[:, 1]], return_inverse=True)
+    key_pairs = np.stack(np.divmod(codes, len(members)), axis=-1)
+    distance = np.linalg.norm(key_centers[..., key_pairs[:, 0], :] - key_centers[..., key_pairs[:, 1], :], axis=-1)
+    gaps = distance - key_radius[..., key_pairs[:, 0]] - key_radius[..., key_pairs[:, 1]]
+    return gaps[..., inverse.ravel()]
+
+
+def separating_gaps(a, b, half_a, half_b):
+    # Separating axis test over the 15 candidate axes, the 3 + 3 box axes and their 9 cross products,
+    # worked in the frame of box a.  The largest gap along an axis is positive when the boxes are
+    # apart (a lower bound on their distance) and otherwise minus the smallest overlap.
+    rotation = np.swapaxes(a[..., :3, :3], -1, -2) @ b[..., :3, :3]
+    offset = np.einsum('...ji,...j->...i', a[..., :3, :3], b[..., :3, 3] - a[..., :3, 3])
+    extent = np.abs(rotation)
+    gaps = [np.abs(offset) - half_a - np.einsum('...ij,...j->...i', extent, half_b),
+            np.abs(np.einsum('...ij,...i->...j', rotation, offset))
+            - np.einsum('...ij,...i->...j', extent, half_a) - half_b]
+    # Axis a_i x b_j, with i1, i2 (and j1, j2) the other two axes in cyclic order.
+    i1, i2 = [1, 2, 0], [2, 0, 1]
+    cross = np.abs(offset[..., i2, None] * rotation[..., i1, :] - offset[..., i1, None] * rotation[..., i2, :])
+    reach = (half_a[..., i1, None] * extent[..., i2, :] + half_a[..., i2, None] * extent[..., i1, :]
+             + half_b[..., None, i1] * extent[..., :, i2] + half_b[..., None, i2] * extent[..., :, i1])
+    norm = np.sqrt(np.maximum(1 - rotation ** 2, 0))
+    # Parallel edges give no cross product axis; the face axes already cover that case.
+    valid = norm > 1e-6
+    gaps.append(np.where(valid, (cross - reach) / np.where(valid, norm, 1), -np.inf).reshape(cross.shape[:-2] + (9,)))
+    return np.concatenate(gaps, axis=-1).max(axis=-1)
+
+
+def box_clearances(matrices, half, pairs, keys, block=100000):
+    # Clearance of each pair, negative when the boxes overlap, and otherwise a lower bound on the
+    # distance.  Key spheres settle the pairs between keys far apart; the separating axis test runs
+    # on the rest, since sphere gaps are far too pessimistic for boxes as flat as the cap slices.
+    gaps = key_sphere_gaps(matrices, half, pairs, keys)
+    near = np.nonzero(gaps < 0)
+    for start in range(0, len(near[-1]), block):
+        entries = tuple(index[start: start + block] for index in near)
+        first, second = pairs[entries[-1], 0], pairs[entries[-1], 1]
+        gaps[entries] = separating_gaps(matrices[entries[:-1] + (first,)], matrices[entries[:-1] + (second,)],
+                                        half[first], half[second])
+    return gaps
+
+
+def part_clearances(kinds, keys, pairs, gaps):
+    # Smallest gap per pair of parts (kind and key), whichever boxes make the parts up:
+    # ((kind, key, kind, key) for each, (..., parts) gaps).
+    names = sorted(set(kinds))
+    kind = np.array([names.index(item) for item in kinds])
+    keys = np.asarray(keys)
+    count = keys.max() + 1
+    part = kind * count + keys
+    codes, inverse = np.unique(part[pairs[:, 0]] * len(names) * count + part[pairs[:, 1]], return_inverse=True)
+    parts = [divmod(a, count) + divmod(b, count) for a, b in zip(*np.divmod(codes, len(names) * count))]
+    closest = np.full(gaps.shape[:-1] + (len(parts),), np.inf)
+    np.minimum.at(closest, (Ellipsis, inverse.ravel()), gaps)
+    return [(names[a], b, names[c], d) for a, b, c, d in parts], closest
+
+
+def collision_report(names, kinds, keys, matrices, half, margin=0.0):
+    # Prints overlapping (and closer than margin) parts, one line per pair of parts.
+    pairs = box_pairs(kinds, keys)
+    gaps = box_clearances(matrices, half, pairs, keys)
+    parts, closest = part_clearances(kinds, keys, pairs, gaps)
+    key_names = dict(zip(keys, names))
+    for (kind_a, key_a, kind_b, key_b), gap in zip(parts, closest):
+        part = (kind_a, key_names[key_a], kind_b, key_names[key_b])
+        if gap < 0:
+            print('COLLISION {} {} / {} {}: overlap {:.2f}'.format(*part, -gap))
+        elif gap < margin:
+            print('CLEARANCE {} {} / {} {}: {:.2f}'.format(*part, gap))
+    kind_a, key_a, kind_b, key_b = parts[np.argmin(closest)]
+    print('MINIMUM CLEARANCE {:.2f} between {} {} and {} {}, {} collisions'.format(
+        closest.min(), kind_a, key_names[key_a], kind_b, key_names[key_b], int((closest < 0).sum())))
+    return closest
@@ -0,0 +1,111 @@
+import numpy as np
+
+# Plate outlines straight to DXF, without a geometry kernel.  Files are plain R12: closed POLYLINEs
+# and CIRCLEs in the ENTITIES section, which every CAD and laser cutting tool reads.
+
+
+def circle_points(center, radius, segments=64):
+    angles = np.linspace(0, 2 * np.pi, segments, endpoint=False)
+    return np.column_stack([center[0] + radius * np.cos(angles), center[1] + radius * np.sin(angles)])
+
+
+def _covered(points, polygons, eps):
+    # Points strictly inside any of the (convex, counter-clockwise) polygons.
+    covered = np.zeros(len(points), dtype=bool)
+    for polygon in polygons:
+        edges = np.roll(polygon, -1, axis=0) - polygon
+        offsets = points[:, None, :] - polygon[None, :, :]
+        cross = edges[None, :, 0] * offsets[:, :, 1] - edges[None, :, 1] * offsets[:, :, 0]
+        covered |= np.all(cross > eps * np.linalg.norm(edges, axis=1)[None, :], axis=1)
+    return covered
+
+
+def outline_loops(polygons, eps=1e-4, decimals=4):
+    # Boundary of the union of convex polygons, as closed loops: outer boundaries counter-clockwise,
+    # holes clockwise.  Every edge is split where others cross it, and a piece is kept when the
+    # area just to its right is not covered by any polygon.
+    polygons = [np.asarray(polygon, dtype=float) for polygon in polygons]
+    for i, polygon in enumerate(polygons):
+        area = np.sum(polygon[:, 0] * np.roll(polygon[:, 1], -1) - np.roll(polygon[:, 0], -1) * polygon[:, 1])
+        if area < 0:
+            polygons[i] = polygon[::-1]
+    starts = np.vstack(polygons)
+    ends = np.vstack([np.roll(polygon, -1, axis=0) for polygon in polygons])
+    directions = ends - starts
+
+    pieces = []
+    for start, direction in zip(starts, directions):
+        # Where every other edge crosses this one, as a fraction along it.
+        denominator = direction[0] * directions[:, 1] - direction[1] * directions[:, 0]
+        offset = starts - start
+        with np.errstate(divide='ignore', invalid='ignore'):
+            t = (offset[:, 0] * directions[:, 1] - offset[:, 1] * directions[:, 0]) / denominator
+            u = (offset[:, 0] * direction[1] - offset[:, 1] * direction[0]) / denominator
+        hits = (np.abs(denominator) > 1e-12) & (t > 0) & (t < 1) & (u >= 0) & (u <= 1)
+        t = np.unique(np.concatenate([[0, 1], t[hits]]))
+        for t0, t1 in zip(t[:-1], t[1:]):
+            pieces.append((start + t0 * direction, start + t1 * direction))
+    pieces = np.array(pieces)
+
+    middles = pieces.mean(axis=1)
+    directions = pieces[:, 1] - pieces[:, 0]
+    lengths = np.linalg.norm(directions, axis=1)
+    keep = lengths > eps
+    right = np.column_stack([directions[:, 1], -directions[:, 0]])
+    right[keep] /= lengths[keep, None]
+    keep &= ~_covered(middles + eps * right, polygons, eps * eps)
+    pieces = pieces[keep]
+
+    # Chain the pieces end to start; pieces shared by two polygons are only used once.
+    links = {}
+    for a, b in np.round(pieces, decimals):
+        links.setdefault(tuple(a), set()).add(tuple(b))
+    loops = []
+    while links:
+        start = next(iter(links))
+        loop = [start]
+        point = start
+        while point in links:
+            following = links[point]
+            step = following.pop()
+            if not following:
+                del links[point]
+            if step == start:
+                break
+            loop.append(step)
+            point = step
+        if len(loop) > 2:
+            loops.append(_drop_collinear(np.array(loop)))
+    return loops
+
+
+def _drop_collinear(loop, eps=1e-9):
+    before = np.roll(loop, 1, axis=0)
+    after = np.roll(loop, -1, axis=0)
+    cross = (loop[:, 0] - before[:, 0]) * (after[:, 1] - before[:, 1]) - (loop[:, 1] - before[:, 1]) * (after[:, 0] - before[:, 0])
+    return loop[np.abs(cross) > eps]
+
+
+def _write_polyline(fid, points, layer):
+    fid.write('0\nPOLYLINE\n8\n{}\n66\n1\n70\n1\n'.format(layer))
+    for x, y in points:
+        fid.write('0\nVERTEX\n8\n{}\n10\n{:.6f}\n20\n{:.6f}\n30\n0.0\n'.format(layer, x, y))
+    fid.write('0\nSEQEND\n8\n{}\n'.format(layer))
+
+
+def _write_circle(fid, center, radius, layer):
+    fid.write('0\nCIRCLE\n8\n{}\n10\n{:.6f}\n20\n{:.6f}\n30\n0.0\n40\n{:.6f}\n'.format(layer, center[0], center[1], radius))
+
+
+def write_dxf(fname, loops, circles, mirror=False):
+    # loops are closed 2D point lists, circles (center, radius) pairs.  mirror writes the plate for
+    # the other hand by negating x.
+    print("EXPORTING TO {}".format(fname))
+    sign = np.array([-1. if mirror else 1., 1.])
+    with open(fname + ".dxf", mode='w') as fid:
+        fid.write('0\nSECTION\n2\nENTITIES\n')
+        for loop in loops:
+            _write_polyline(fid, np.asarray(loop) * sign, 'OUTLINE')
+        for center, radius in circles:
+            _write_circle(fid, np.asarray(center) * sign, radius, 'HOLES')
+        fid.write('0\nENDSEC\n0\nEOF\n')
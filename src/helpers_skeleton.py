@@ -0,0 +1,76 @@
+import numpy as np
+import json
+
+# Placement only, no geometry and no CAD package.  A "shape" here is a 4x4 homogeneous transform,
+# and the helpers the placement functions call compose onto it, so key_place(np.eye(4), ...)
+# returns the matrix that key_place() applies to a plate.
+
+debug_trace = False
+
+
+def debugprint(info):
+    if debug_trace:
+        print(info)
+
+
+def vectors(values):
+    # x, y, z may each be a number or an array with one value per candidate (see sweep.py), so
+    # the result is (3,) or (N, 3), and the matrices built from it (4, 4) or (N, 4, 4).
+    return np.stack(np.broadcast_arrays(*[np.asarray(value, dtype=float) for value in values[:3]]), axis=-1)
+
+
+def axis_rotation(axis, angle):
+    a, b = [(1, 2), (2, 0), (0, 1)][axis]
+    matrix = np.zeros(np.shape(angle) + (4, 4))
+    matrix[..., axis, axis] = 1
+    matrix[..., 3, 3] = 1
+    matrix[..., a, a] = np.cos(angle)
+    matrix[..., a, b] = -np.sin(angle)
+    matrix[..., b, a] = np.sin(angle)
+    matrix[..., b, b] = np.cos(angle)
+    return matrix
+
+
+def translate(shape, vector):
+    vector = vectors(vector)
+    matrix = np.zeros(vector.shape[:-1] + (4, 4))
+    matrix[...] = np.eye(4)
+    matrix[..., :3, 3] = vector
+    return matrix @ shape
+
+
+def rotate(shape, angle):
+    # Degrees about x, then y, then z, all about the origin, as in the CAD engines.
+    angle = np.radians(vectors(angle))
+    return axis_rotation(2, angle[..., 2]) @ axis_rotation(1, angle[..., 1]) @ axis_rotation(0, angle[..., 0]) @ shape
+
+
+def transform(shape, matrix):
+    return np.asarray(matrix) @ shape
+
+
+mirror_planes = {'YZ': 0, 'XZ': 1, 'XY': 2}
+
+
+def mirror(shape, plane=None):
+    matrix = np.eye(4)
+    matrix[mirror_planes[plane], mirror_planes[plane]] = -1
+    return matrix @ shape
+
+
+skeleton_columns = ['id', 'side', 'column', 'row', 'cap_size', 'x', 'y', 'z', 'nx', 'ny', 'nz',
+                    'r11', 'r12', 'r13', 'r21', 'r22', 'r23', 'r31', 'r32', 'r33']
+
+
+def export_skeleton(keys, fname):
+    # keys are dicts with id, side, column, row, cap_size, center, normal and rotation.
+    print("EXPORTING TO {}".format(fname))
+    with open(fname + ".json", mode='w') as fid:
+        json.dump(keys, fid, indent=1)
+    with open(fname + ".csv", mode='w') as fid:
+        fid.write(','.join(skeleton_columns) + '\n')
+        for key in keys:
+            values = [key['id'], key['side'], key['column'], key['row'], key['cap_size']]
+            values += ['{:.6f}'.format(value) for value in key['center'] + key['normal']]
+            values += ['{:.9f}'.format(value) for row in key['rotation'] for value in row]
+            fid.write(','.join('' if value is None else str(value) for value in values) + '\n')
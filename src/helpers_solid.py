@@ -1,7 +1,24 @@
 import solid as sl
+from scipy.spatial import ConvexHull as sphull
+import numpy as np
+import shutil
+import subprocess
+from contextlib import contextmanager
 
 debug_trace = False
 
+# Emit repeated sub-trees once as OpenSCAD modules instead of inlining every copy.
+scad_modules = True
+
+# Compute hulls in python and write a literal polyhedron() instead of leaving hull() to OpenSCAD.
+polyhedron_hulls = False
+
+# Rendered from the .scad by OpenSCAD after export_file(), when it is installed: 'STL', '3MF'.
+export_formats = []
+
+# Clamp hull points at the floor (z = 0) as they are built; implies polyhedron hulls where possible.
+floor_clamp = False
+
 def debugprint(info):
     if debug_trace:
         print(info)
@@ -30,6 +47,11 @@ def translate(shape, vector):
     return sl.translate(tuple(vector))(shape)
 
 
+def instance(shape, vector):
+    # OpenSCAD copies are already cheap, and scad_modules writes the shared subtree once.
+    return translate(shape, vector)
+
+
 def mirror(shape, plane=None):
     debugprint('mirror()')
     planes = {
@@ -43,41 +65,169 @@ def mirror(shape, plane=None):
     return sl.mirror(planes[plane])(shape)
 
 
+def _is_plain(shape, name):
+    # A bare union()/difference() node that can be merged into its parent without changing the result.
+    return (
+        shape.name == name and not shape.params and shape.modifier == ''
+        and not shape.is_hole and not shape.is_part_root
+    )
+
+
 def union(shapes):
     debugprint('union()')
-    shape = None
+    shapes = [item for item in shapes if item is not None]
+    items = []
     for item in shapes:
-        if shape is None:
-            shape = item
+        if _is_plain(item, 'union'):
+            items.extend(item.children)
         else:
-            shape += item
-    return shape
+            items.append(item)
+    if len(shapes) == 1:
+        return shapes[0]
+    if len(items) == 0:
+        return None
+    return sl.union()(*items)
 
 
 def add(shapes):
     debugprint('union()')
-    shape = None
-    for item in shapes:
-        if shape is None:
-            shape = item
-        else:
-            shape += item
-    return shape
+    return union(shapes)
 
 
 def difference(shape, shapes):
     debugprint('difference()')
-    for item in shapes:
-        shape -= item
-    return shape
+    if len(shapes) == 0:
+        return shape
+    if _is_plain(shape, 'difference'):
+        return sl.difference()(*shape.children, *shapes)
+    return sl.difference()(shape, *shapes)
 
 
 def intersect(shape1, shape2):
     return sl.intersect()(shape1, shape2)
 
 
+def _rotation_matrix(angle):
+    # OpenSCAD rotate([x, y, z]) turns about X, then Y, then Z.
+    if np.isscalar(angle):
+        angle = [0, 0, angle]
+    rx, ry, rz = np.radians(np.array(angle, dtype=float))
+    x_rot = np.array([[1, 0, 0], [0, np.cos(rx), -np.sin(rx)], [0, np.sin(rx), np.cos(rx)]])
+    y_rot = np.array([[np.cos(ry), 0, np.sin(ry)], [0, 1, 0], [-np.sin(ry), 0, np.cos(ry)]])
+    z_rot = np.array([[np.cos(rz), -np.sin(rz), 0], [np.sin(rz), np.cos(rz), 0], [0, 0, 1]])
+    return z_rot @ y_rot @ x_rot
+
+
+def shape_points(shape):
+    # Corner points of a tree of cubes, extruded polygons and polyhedra under rigid transforms.
+    # Returns None for anything whose vertices are not known exactly (spheres, imports, ...).
+    name = shape.name
+    params = shape.params
+    if name == 'cube':
+        size = params['size']
+        if np.isscalar(size):
+            size = [size, size, size]
+        corners = np.array([[x, y, z] for x in (0, 1) for y in (0, 1) for z in (0, 1)], dtype=float)
+        corners = corners * np.array(size, dtype=float)
+        if params['center']:
+            corners -= np.array(size, dtype=float) / 2
+        return corners
+
+    if name == 'polyhedron':
+        return np.array(params['points'], dtype=float)
+
+    if name == 'polygon':
+        points = np.array(params['points'], dtype=float)
+        return np.column_stack([points, np.zeros(len(points))])
+
+    children = []
+    for child in shape.children:
+        points = shape_points(child)
+        if points is None:
+            return None
+        children.append(points)
+    if len(children) == 0:
+        return None
+    points = np.vstack(children)
+
+    if name in ['union', 'hull']:
+        return points
+    if name == 'translate':
+        return points + np.array(params['v'], dtype=float)
+    if name == 'rotate' and params['v'] is None:
+        return points @ _rotation_matrix(params['a']).T
+    if name == 'mirror':
+        normal = np.array(params['v'], dtype=float)
+        normal = normal / np.linalg.norm(normal)
+        return points - 2 * np.outer(points @ normal, normal)
+    if name == 'multmatrix':
+        matrix = np.array(params['m'], dtype=float)
+        return points @ matrix[:3, :3].T + matrix[:3, 3]
+    if name == 'linear_extrude' and not params['twist'] and params['scale'] is None:
+        height = params['height']
+        base = 0.0
+        if params['center']:
+            base = -height / 2
+        bottom = points.copy()
+        bottom[:, 2] = base
+        top = points.copy()
+        top[:, 2] = base + height
+        return np.vstack([bottom, top])
+    return None
+
+
+def floor_clip(points):
+    # Points whose hull is the part of the original hull above z = 0: the points above, plus where
+    # each segment from a point above to one below crosses the floor.
+    above = points[points[:, 2] >= 0]
+    below = points[points[:, 2] < 0]
+    if len(below) == 0:
+        return points
+    t = above[:, None, 2] / (above[:, None, 2] - below[None, :, 2])
+    crossings = above[:, None, :] + t[:, :, None] * (below[None, :, :] - above[:, None, :])
+    crossings[:, :, 2] = 0
+    return np.vstack([above, crossings.reshape(-1, 3)])
+
+
+def point_polyhedron(points):
+    # The scipy hull of the points as a literal polyhedron.  Raises on flat or degenerate sets.
+    hull_calc = sphull(points)
+    index = {vert: i for i, vert in enumerate(hull_calc.vertices)}
+    faces = []
+    for simplex, equation in zip(hull_calc.simplices, hull_calc.equations):
+        p0, p1, p2 = points[simplex]
+        # OpenSCAD wants faces clockwise when seen from outside.
+        if np.dot(np.cross(p1 - p0, p2 - p0), equation[:3]) > 0:
+            simplex = simplex[::-1]
+        faces.append([index[item] for item in simplex])
+    return sl.polyhedron(points=np.round(points[hull_calc.vertices], 6).tolist(), faces=faces)
+
+
 def hull_from_points(points):
-    return sl.hull()(*points)
+    points = np.array(points, dtype=float)
+    if floor_clamp:
+        points = floor_clip(points)
+        # Nothing of it above the floor.
+        if len(points) == 0 or np.all(points[:, 2] == 0):
+            return None
+    if polyhedron_hulls or floor_clamp:
+        try:
+            return point_polyhedron(points)
+        except Exception:
+            # Degenerate (flat or too few) point sets are left to OpenSCAD.
+            pass
+    # hull() of a polyhedron made of one face through every point is OpenSCAD's hull of the points.
+    return sl.hull()(sl.polyhedron(points=np.round(points, 6).tolist(), faces=[list(range(len(points)))]))
+
+
+def _shapes_points(shapes):
+    vertices = []
+    for shape in shapes:
+        points = shape_points(shape)
+        if points is None:
+            return None
+        vertices.append(points)
+    return np.vstack(vertices)
 
 
 def hull_from_shapes(shapes, points=None):
@@ -86,11 +236,34 @@ def hull_from_shapes(shapes, points=None):
         hs.extend(points)
     if shapes is not None:
         hs.extend(shapes)
+    if polyhedron_hulls or floor_clamp:
+        vertices = _shapes_points(hs)
+        if vertices is not None:
+            # None here means floor_clamp left nothing of the hull.
+            return hull_from_points(vertices)
     return sl.hull()(*hs)
 
 
+def below_floor(shape):
+    # Only hulls computed here are clamped; a hull() left to OpenSCAD could reach anywhere.
+    if shape.name == 'hull':
+        return True
+    return any(below_floor(item) for item in shape.children)
+
+
+@contextmanager
+def boolean_stage(name, options=None):
+    # OpenSCAD evaluates the booleans itself, there are no options to set.
+    yield
+
+
+def simplify(shape, label=''):
+    # Nothing to merge, OpenSCAD meshes the result itself.
+    return shape
+
+
 def tess_hull(shapes, sl_tol=.5, sl_angTol=1):
-    return sl.hull()(*shapes)
+    return hull_from_shapes(shapes)
 
 
 def triangle_hulls(shapes):
@@ -123,11 +296,122 @@ def import_file(fname):
     return sl.import_(fname + ".stl")
 
 
+def _scad_indent(text):
+    return text.replace("\n", "\n\t")
+
+
+def _scad_children(shape):
+    # Nested plain unions are collapsed into one n-ary union when rendered.
+    if not _is_plain(shape, 'union'):
+        return shape.children
+    items = []
+    stack = list(reversed(shape.children))
+    while stack:
+        child = stack.pop()
+        if _is_plain(child, 'union'):
+            stack.extend(reversed(child.children))
+        else:
+            items.append(child)
+    return items
+
+
+def scad_render_modules(shape):
+    # Structural hash of every node: its own call string plus the keys of its children.
+    # Identical sub-trees share a key no matter which python object produced them.  The key is
+    # SolidPython's text for the node alone, a private method: without it, export inlines as before.
+    render_head = getattr(sl.OpenSCADObject, '_render_str_no_children', None)
+    if render_head is None:
+        return None
+    heads = []
+    children = []
+    key_index = {}
+    node_index = {}
+    node_children = {}
+
+    stack = [(shape, False)]
+    while stack:
+        obj, expanded = stack.pop()
+        if id(obj) in node_index:
+            continue
+        if obj.is_hole:
+            return None
+        if not expanded:
+            stack.append((obj, True))
+            node_children[id(obj)] = _scad_children(obj)
+            for child in node_children[id(obj)]:
+                if id(child) not in node_index:
+                    stack.append((child, False))
+            continue
+
+        key = (render_head(obj), tuple(node_index[id(child)] for child in node_children[id(obj)]))
+        if key not in key_index:
+            key_index[key] = len(heads)
+            heads.append(key[0])
+            children.append(key[1])
+        node_index[id(obj)] = key_index[key]
+
+    # Children always have a lower index than their parents, so walking backwards
+    # propagates the number of times each sub-tree is instanced in the full tree.
+    root = node_index[id(shape)]
+    count = [0] * len(heads)
+    count[root] = 1
+    for i in range(root, -1, -1):
+        for child in children[i]:
+            count[child] += count[i]
+
+    modules = {}
+    for i in range(len(heads)):
+        if count[i] > 1 and len(children[i]) > 0:
+            modules[i] = "dm_{}".format(len(modules))
+
+    def render(i, body=False):
+        if i in modules and not body:
+            return "\n{}();".format(modules[i])
+        if len(children[i]) == 0:
+            return heads[i] + ";"
+        text = "".join(render(child) for child in children[i])
+        return heads[i] + " {" + _scad_indent(text) + "\n}"
+
+    text = ""
+    for i, name in modules.items():
+        text += "\nmodule {}() {{".format(name) + _scad_indent(render(i, body=True)) + "\n}\n"
+    text += render(root)
+    debugprint('scad modules: {} of {} unique nodes'.format(len(modules), len(heads)))
+    return text
+
+
 def export_file(shape, fname):
     print("EXPORTING TO {}".format(fname))
-    sl.scad_render_to_file(shape, fname + ".scad")
+    text = None
+    if scad_modules:
+        text = scad_render_modules(shape)
+    if text is None:
+        sl.scad_render_to_file(shape, fname + ".scad")
+    else:
+        with open(fname + ".scad", mode='w') as fid:
+            fid.write("// Generated by SolidPython\n" + text + "\n")
+    for export_format in export_formats:
+        if export_format not in ['STL', '3MF']:
+            print("NO {} EXPORT FOR SOLID".format(export_format))
+        elif shutil.which('openscad') is None:
+            print("NO {} EXPORT, OPENSCAD NOT FOUND".format(export_format))
+        else:
+            subprocess.run(['openscad', '-o', fname + '.' + export_format.lower(), fname + '.scad'], capture_output=True)
+
+
+def transform(shape, matrix):
+    return sl.multmatrix(np.asarray(matrix, dtype=float).tolist())(shape)
+
+
+def place_instances(shape, matrices):
+    # No instancing in OpenSCAD; with scad_modules the repeated shape is written once as a module.
+    return add([transform(shape, matrix) for matrix in matrices])
+
+
+def export_assembly(parts, fname):
+    print("NO STEP ASSEMBLY FOR SOLID")
 
 
 def export_dxf(shape, fname):
     print("NO DXF EXPORT FOR SOLID".format(fname))
-    pass
\ No newline at end of file
+    pass
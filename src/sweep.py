@@ -0,0 +1,200 @@
+import os
+import re
+import sys
+import copy
+import json
+import time
+import importlib
+import numpy as np
+from scipy.spatial import ConvexHull
+from concurrent.futures import ProcessPoolExecutor
+from helpers_collisions import box_pairs, box_clearances, part_clearances
+
+# Design-space sweep over the key placement parameters.  Run from src/ like model_builder.py:
+#   python sweep.py                (grid over the ranges below)
+#   python sweep.py random 100000  (uniform random samples from the same ranges)
+# The model is the one in run_config.json, loaded with the skeleton engine, so each candidate costs
+# a few matrix products instead of a CAD build.  Every parameter below is set to an array holding
+# one value per candidate and the placement functions evaluate all of them at once.
+# run_config.json is restored when finished, results go to things/<config_name>_sweep.csv.
+
+# name: (low, high, grid steps).  Angles are in radians like the configuration.
+# Single entries of list parameters are swept as 'name[i]' or 'name[i][j]'.
+parameters = {
+    'alpha': (np.pi / 18.0, np.pi / 9.0, 5),
+    'beta': (np.pi / 48.0, np.pi / 24.0, 5),
+    'centercol': (2, 4, 3),
+    'tenting_angle': (np.pi / 36.0, np.pi / 6.0, 6),
+    'thumb_offsets[0]': (0.0, 12.0, 4),
+    'thumb_offsets[2]': (0.0, 14.0, 3),
+    'column_offsets[2][1]': (0.0, 6.0, 3),
+}
+
+# Parameters that only make sense as whole numbers.
+integer_parameters = ['centercol']
+
+metrics = ['footprint', 'height', 'bbox_x', 'bbox_y', 'bbox_z',
+           'min_spacing', 'max_spacing', 'thumb_home', 'clearance', 'collisions']
+
+# The clearance and collision columns (helpers_collisions) take a few ms per candidate, far more
+# than everything else; without them the table fills with nan.
+collision_metrics = True
+
+chunk_size = 500
+sweep_workers = os.cpu_count()
+
+dactyl_manuform = None
+list_defaults = {}
+
+
+def load_model():
+    global dactyl_manuform, list_defaults
+    with open('run_config.json', mode='r') as fid:
+        original_config = fid.read()
+    run_config = json.loads(original_config)
+    run_config['ENGINE'] = 'skeleton'
+    try:
+        with open('run_config.json', mode='w') as fid:
+            json.dump(run_config, fid, indent=4)
+        if dactyl_manuform is None:
+            import dactyl_manuform
+        else:
+            importlib.reload(dactyl_manuform)
+    finally:
+        with open('run_config.json', mode='w') as fid:
+            fid.write(original_config)
+    # Untouched copies of the list parameters, set_candidates() writes arrays into their entries.
+    names = [parameter_target(name)[0] for name in parameters]
+    list_defaults = {name: copy.deepcopy(getattr(dactyl_manuform, name))
+                     for name in names if isinstance(getattr(dactyl_manuform, name), list)}
+    return dactyl_manuform
+
+
+def parameter_target(name):
+    # 'column_offsets[2][1]' -> ('column_offsets', [2, 1])
+    match = re.match(r'(\w+)((?:\[\d+\])*)$', name)
+    return match.group(1), [int(index) for index in re.findall(r'\d+', match.group(2))]
+
+
+def grid_candidates():
+    axes = []
+    for name, (low, high, steps) in parameters.items():
+        values = np.linspace(low, high, steps)
+        axes.append(np.round(values) if name in integer_parameters else values)
+    return np.stack([axis.ravel() for axis in np.meshgrid(*axes, indexing='ij')], axis=-1)
+
+
+def random_candidates(count, seed=None):
+    rng = np.random.default_rng(seed)
+    columns = []
+    for name, (low, high, _) in parameters.items():
+        if name in integer_parameters:
+            columns.append(rng.integers(low, high, endpoint=True, size=count).astype(float))
+        else:
+            columns.append(rng.uniform(low, high, size=count))
+    return np.stack(columns, axis=-1)
+
+
+def set_candidates(dm, defaults, candidates):
+    # Module globals become arrays of candidate values; list parameters get fresh copies first.
+    for name in defaults:
+        setattr(dm, name, copy.deepcopy(defaults[name]))
+    for i, name in enumerate(parameters):
+        base, indices = parameter_target(name)
+        if not indices:
+            setattr(dm, base, candidates[:, i])
+            continue
+        target = getattr(dm, base)
+        for index in indices[:-1]:
+            target = target[index]
+        target[indices[-1]] = candidates[:, i]
+    dm.row_radius, dm.column_radius, dm.column_x_delta = dm.curvature_radii(dm.alpha, dm.beta)
+
+
+def key_matrices(dm, count):
+    # (N, K, 4, 4): main grid keys first, then the thumb cluster.
+    placements = dm.key_placements() + dm.thumb_plate_placements()
+    return np.stack([np.broadcast_to(place(np.eye(4)), (count, 4, 4)) for place in placements], axis=1)
+
+
+def grid_neighbours(grid):
+    index = {key: i for i, key in enumerate(grid)}
+    pairs = []
+    for (column, row), i in index.items():
+        for neighbour in [(column + 1, row), (column, row + 1)]:
+            if neighbour in index:
+                pairs.append((i, index[neighbour]))
+    return np.array(pairs)
+
+
+def evaluate(dm, defaults, candidates):
+    count = len(candidates)
+    set_candidates(dm, defaults, candidates)
+    matrices = key_matrices(dm, count)
+    grid = dm.key_grid()
+
+    # Plate corners at the bottom of the plate and at the top of the caps.
+    corners = np.array([[x, y, z, 1]
+                        for x in [-dm.mount_width / 2, dm.mount_width / 2]
+                        for y in [-dm.mount_height / 2, dm.mount_height / 2]
+                        for z in [0, dm.cap_top_height]])
+    points = (matrices @ corners.T).swapaxes(-1, -2)[..., :3].reshape(count, -1, 3)
+    centers = matrices[..., :3, :3] @ [0, 0, dm.plate_thickness] + matrices[..., :3, 3]
+
+    pairs = grid_neighbours(grid)
+    spacing = np.linalg.norm(centers[:, pairs[:, 0]] - centers[:, pairs[:, 1]], axis=-1)
+
+    home = centers[:, grid.index((1, dm.centerrow))]
+    thumbs = centers[:, len(grid):]
+    thumb_home = np.linalg.norm(thumbs - home[:, None], axis=-1).min(axis=1)
+
+    # Cap, plate and switch boxes: smallest clearance, and how many pairs of parts collide.
+    clearance = collisions = np.full(count, np.nan)
+    if collision_metrics:
+        names, kinds, keys, boxes, half = dm.key_boxes()
+        pairs = box_pairs(kinds, keys)
+        gaps = box_clearances(np.broadcast_to(boxes, (count,) + boxes.shape[-3:]), half, pairs, keys)
+        closest = part_clearances(kinds, keys, pairs, gaps)[1]
+        clearance, collisions = closest.min(axis=1), (closest < 0).sum(axis=1)
+
+    extent = points.max(axis=1) - points.min(axis=1)
+    footprint = np.array([ConvexHull(xy).volume for xy in points[..., :2]])
+    return np.stack([footprint, points[..., 2].max(axis=1), extent[:, 0], extent[:, 1], extent[:, 2],
+                     spacing.min(axis=1), spacing.max(axis=1), thumb_home,
+                     clearance, collisions], axis=-1)
+
+
+def evaluate_chunk(candidates):
+    # Worker entry point.  The model was loaded by the parent and comes along with the fork.
+    return evaluate(dactyl_manuform, list_defaults, candidates)
+
+
+def sweep(candidates, workers=None):
+    workers = workers or sweep_workers
+    chunks = [candidates[i: i + chunk_size] for i in range(0, len(candidates), chunk_size)]
+    if workers > 1 and len(chunks) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(evaluate_chunk, chunks))
+    else:
+        results = [evaluate_chunk(chunk) for chunk in chunks]
+    return np.concatenate(results)
+
+
+def write_table(fname, candidates, results):
+    print("EXPORTING TO {}".format(fname))
+    header = ','.join(list(parameters) + metrics)
+    np.savetxt(fname, np.hstack([candidates, results]), delimiter=',', header=header, comments='', fmt='%.6g')
+
+
+if __name__ == '__main__':
+    mode = sys.argv[1] if len(sys.argv) > 1 else 'grid'
+    dm = load_model()
+    if mode == 'random':
+        candidates = random_candidates(int(sys.argv[2]) if len(sys.argv) > 2 else 10000)
+    else:
+        candidates = grid_candidates()
+    start = time.perf_counter()
+    results = sweep(candidates)
+    seconds = time.perf_counter() - start
+    print('SWEEP {} candidates in {:.2f} s ({:.0f} per s)'.format(len(candidates), seconds, len(candidates) / seconds))
+    write_table(os.path.join(dm.save_path, dm.config_name + '_sweep.csv'), candidates, results)